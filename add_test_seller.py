@@ -327,6 +327,34 @@ def add_crops_for_seller(seller_id):
         
         print(f"Adding {len(ALL_CROPS)} crops for seller...")
         
+        crop_query = """
+            INSERT INTO seller_crops (
+                id, seller_id, crop_name, crop_variety, is_available,
+                price_per_kg, quantity_available, minimum_order,
+                harvest_season, best_quality_months, quality_grade,
+                organic_certified, pesticide_free, created_at, updated_at
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+        """
+        
+        cultivation_query = """
+            INSERT INTO crop_cultivations (
+                id, seller_crop_id, seed_nursery, land_preparation, planting,
+                crop_management, seed_requirements, cultivation_steps,
+                irrigation_method, fertilizer_used, pest_control_methods,
+                harvesting_method, post_harvest_handling, soil_type,
+                water_requirements, sunlight_requirements, temperature_range,
+                planting_season, growing_duration_days, created_at, updated_at
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+        """
+        
+        # Build every row first, then send each table's rows in one executemany
+        crop_rows = []
+        cultivation_rows = []
+        
         for crop_name in ALL_CROPS:
             # Get crop-specific information
             crop_info = get_crop_varieties_and_info(crop_name)
@@ -347,21 +375,9 @@ def add_crops_for_seller(seller_id):
             quality_grades = ['Premium', 'Grade A', 'Grade B', 'Standard']
             quality = random.choice(quality_grades)
             
-            # Insert seller crop
             seller_crop_id = str(uuid.uuid4())
             
-            crop_query = """
-                INSERT INTO seller_crops (
-                    id, seller_id, crop_name, crop_variety, is_available,
-                    price_per_kg, quantity_available, minimum_order,
-                    harvest_season, best_quality_months, quality_grade,
-                    organic_certified, pesticide_free, created_at, updated_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-            
-            cursor.execute(crop_query, (
+            crop_rows.append((
                 seller_crop_id,
                 seller_id,
                 crop_name,
@@ -379,23 +395,9 @@ def add_crops_for_seller(seller_id):
                 datetime.utcnow()
             ))
             
-            # Insert cultivation information
-            cultivation_query = """
-                INSERT INTO crop_cultivations (
-                    id, seller_crop_id, seed_nursery, land_preparation, planting,
-                    crop_management, seed_requirements, cultivation_steps,
-                    irrigation_method, fertilizer_used, pest_control_methods,
-                    harvesting_method, post_harvest_handling, soil_type,
-                    water_requirements, sunlight_requirements, temperature_range,
-                    planting_season, growing_duration_days, created_at, updated_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-            
             cultivation_id = str(uuid.uuid4())
             
-            cursor.execute(cultivation_query, (
+            cultivation_rows.append((
                 cultivation_id,
                 seller_crop_id,
                 cultivation_info['seed_nursery'],
@@ -420,10 +422,9 @@ def add_crops_for_seller(seller_id):
             ))
             
             crops_added += 1
-            
-            # Print progress every 20 crops
-            if crops_added % 20 == 0:
-                print(f"  ✅ Added {crops_added}/{len(ALL_CROPS)} crops...")
+        
+        cursor.executemany(crop_query, crop_rows)
+        cursor.executemany(cultivation_query, cultivation_rows)
         
         connection.commit()
         cursor.close()
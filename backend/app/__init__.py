@@ -18,8 +18,9 @@ def create_app(config_name=None):
     db.init_app(app)
     CORS(app, 
          origins=app.config['CORS_ORIGINS'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-         allow_headers=['Content-Type', 'Authorization', 'Access-Control-Allow-Credentials'],
+         methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
+         allow_headers=['Content-Type', 'Authorization', 'Access-Control-Allow-Credentials', 'If-Match'],
+         expose_headers=['ETag'],
          supports_credentials=True)
     
     # Register blueprints
@@ -27,22 +28,14 @@ def create_app(config_name=None):
     from app.routes.locations import locations_bp
     from app.routes.seller import seller_bp
     from app.routes.main import main_bp
+    from app.routes.health import health_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(locations_bp, url_prefix='/api/locations')
     app.register_blueprint(seller_bp, url_prefix='/api/seller')
     app.register_blueprint(main_bp, url_prefix='/api')
+    app.register_blueprint(health_bp)
     
-    # Import buyer test blueprint for debugging
-    try:
-        from app.routes.buyer_test import buyer_test_bp
-        app.register_blueprint(buyer_test_bp, url_prefix='/api/buyer')
-        print("SUCCESS: Buyer test blueprint registered successfully")
-    except Exception as e:
-        print(f"ERROR: Error registering buyer test blueprint: {e}")
-        import traceback
-        traceback.print_exc()
-        
     # Import buyer blueprint separately with error handling
     try:
         from app.routes.buyer import buyer_bp
@@ -52,20 +45,39 @@ def create_app(config_name=None):
         print(f"ERROR: Error registering buyer full blueprint: {e}")
         import traceback
         traceback.print_exc()
-        
-    # Import test blueprint for debugging
-    try:
-        from app.routes.main_test import main_test_bp
-        app.register_blueprint(main_test_bp, url_prefix='/api/test')
-        print("SUCCESS: Test blueprint registered successfully")
-    except Exception as e:
-        print(f"ERROR: Error registering test blueprint: {e}")
-        import traceback
-        traceback.print_exc()
     
-    # Create database tables
-    with app.app_context():
+    # Debug blueprints are left out of production
+    if app.config['REGISTER_DEBUG_BLUEPRINTS']:
+        # Import buyer test blueprint for debugging
+        try:
+            from app.routes.buyer_test import buyer_test_bp
+            app.register_blueprint(buyer_test_bp, url_prefix='/api/buyer')
+            print("SUCCESS: Buyer test blueprint registered successfully")
+        except Exception as e:
+            print(f"ERROR: Error registering buyer test blueprint: {e}")
+            import traceback
+            traceback.print_exc()
+            
+        # Import test blueprint for debugging
+        try:
+            from app.routes.main_test import main_test_bp
+            app.register_blueprint(main_test_bp, url_prefix='/api/test')
+            print("SUCCESS: Test blueprint registered successfully")
+        except Exception as e:
+            print(f"ERROR: Error registering test blueprint: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database tables and seed locations and the crop catalog"""
         from app.utils.database import init_database
         init_database()
     
+    # Create database tables on boot only where configured, production uses `flask init-db`
+    if app.config['INIT_DATABASE_ON_STARTUP']:
+        with app.app_context():
+            from app.utils.database import init_database
+            init_database()
+    
     return app
\ No newline at end of file
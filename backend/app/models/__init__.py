@@ -1,5 +1,6 @@
 from .user import User
 from .location import Province, District, City
-from .seller import Seller, SellerCrop, CropCultivation
+from .crop import Crop
+from .seller import Seller, SellerCrop, CropCultivation, SellerCropDeletion
 
-__all__ = ['User', 'Province', 'District', 'City', 'Seller', 'SellerCrop', 'CropCultivation']
\ No newline at end of file
+__all__ = ['User', 'Province', 'District', 'City', 'Crop', 'Seller', 'SellerCrop', 'CropCultivation', 'SellerCropDeletion']
@@ -0,0 +1,24 @@
+from app import db
+from datetime import datetime
+
+class Crop(db.Model):
+    """Catalog of crop types the recommendation model knows about"""
+    __tablename__ = 'crops'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)  # Normalized key, e.g. 'kidneybeans'
+    display_name = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    listings = db.relationship('SellerCrop', backref='catalog_crop', lazy='dynamic')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'display_name': self.display_name
+        }
+    
+    def __repr__(self):
+        return f'<Crop {self.name}>'
@@ -64,6 +64,13 @@ class Seller(db.Model):
     # Relationships
     crops = db.relationship('SellerCrop', backref='seller', lazy='dynamic', cascade='all, delete-orphan')
     
+    # Serve location-filtered searches that have no crop to start from
+    __table_args__ = (
+        db.Index('ix_sellers_province_active', 'province_id', 'is_active', 'is_verified'),
+        db.Index('ix_sellers_district_active', 'district_id', 'is_active', 'is_verified'),
+        db.Index('ix_sellers_city_active', 'city_id', 'is_active', 'is_verified'),
+    )
+    
     def get_full_address(self):
         """Get formatted full address"""
         address_parts = [self.address_line_1]
@@ -140,6 +147,29 @@ class Seller(db.Model):
         
         return seller_dict
     
+    def to_summary_dict(self, locations):
+        """Convert seller to the short dictionary used in list views, with names from a location index"""
+        name = lambda item: item['name'] if item else None
+        return {
+            'id': self.id,
+            'business_name': self.business_name,
+            'contact_number': self.contact_number,
+            'location': {
+                'province_id': self.province_id,
+                'district_id': self.district_id,
+                'city_id': self.city_id,
+                'province': name(locations.provinces.get(self.province_id)),
+                'district': name(locations.districts.get(self.district_id)),
+                'city': name(locations.cities.get(self.city_id))
+            },
+            'shop_details': {
+                'shop_name': self.shop_name
+            },
+            'verification': {
+                'is_verified': self.is_verified
+            }
+        }
+    
     def __repr__(self):
         return f'<Seller {self.business_name}>'
 
@@ -150,6 +180,7 @@ class SellerCrop(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     seller_id = db.Column(db.String(36), db.ForeignKey('sellers.id'), nullable=False)
     crop_name = db.Column(db.String(100), nullable=False, index=True)
+    crop_id = db.Column(db.Integer, db.ForeignKey('crops.id'), nullable=True)  # Catalog entry, set from crop_name
     crop_variety = db.Column(db.String(100), nullable=True)  # e.g., 'Basmati', 'Jasmine'
     
     # Availability and Pricing
@@ -173,16 +204,33 @@ class SellerCrop(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Incremented on every change, used for optimistic concurrency
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    
     # Relationships
     cultivation_info = db.relationship('CropCultivation', backref='crop', uselist=False, cascade='all, delete-orphan')
     
+    # Serve crop searches (catalog id, then the availability, organic and price filters),
+    # the per-seller change feed in (updated_at, id) order and the seller dashboard aggregate
+    __table_args__ = (
+        db.Index('ix_seller_crops_crop_available', 'crop_id', 'is_available', 'organic_certified', 'price_per_kg'),
+        db.Index('ix_seller_crops_seller_updated', 'seller_id', 'updated_at', 'id'),
+        db.Index('ix_seller_crops_seller_available_created', 'seller_id', 'is_available', 'created_at'),
+    )
+    
+    # ORM updates and deletes apply only to the version that was loaded and bump it,
+    # raising StaleDataError if another writer changed the row in between
+    __mapper_args__ = {'version_id_col': version}
+    
     def to_dict(self, include_cultivation=False):
         """Convert crop to dictionary"""
         crop_dict = {
             'id': self.id,
             'seller_id': self.seller_id,
             'crop_name': self.crop_name,
+            'crop_id': self.crop_id,
             'crop_variety': self.crop_variety,
+            'version': self.version,
             'availability': {
                 'is_available': self.is_available,
                 'quantity_available': self.quantity_available,
@@ -213,6 +261,32 @@ class SellerCrop(db.Model):
         
         return crop_dict
     
+    def to_summary_dict(self):
+        """Convert crop to the short dictionary used in list views, without seasonal info or timestamps"""
+        return {
+            'id': self.id,
+            'seller_id': self.seller_id,
+            'crop_name': self.crop_name,
+            'crop_id': self.crop_id,
+            'crop_variety': self.crop_variety,
+            'version': self.version,
+            'availability': {
+                'is_available': self.is_available,
+                'quantity_available': self.quantity_available,
+                'minimum_order': self.minimum_order
+            },
+            'pricing': {
+                'price_per_kg': self.price_per_kg,
+                'price_per_unit': self.price_per_unit,
+                'unit_type': self.unit_type
+            },
+            'quality': {
+                'quality_grade': self.quality_grade,
+                'organic_certified': self.organic_certified,
+                'pesticide_free': self.pesticide_free
+            }
+        }
+    
     def __repr__(self):
         return f'<SellerCrop {self.crop_name}>'
 
@@ -279,4 +353,21 @@ class CropCultivation(db.Model):
         }
     
     def __repr__(self):
-        return f'<CropCultivation {self.id}>'
\ No newline at end of file
+        return f'<CropCultivation {self.id}>'
+
+class SellerCropDeletion(db.Model):
+    """Record of a deleted seller crop, so the change feed can report deletions"""
+    __tablename__ = 'seller_crop_deletions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    seller_crop_id = db.Column(db.String(36), nullable=False)
+    seller_id = db.Column(db.String(36), nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_seller_crop_deletions_seller_id', 'seller_id', 'id'),
+        db.Index('ix_seller_crop_deletions_seller_deleted', 'seller_id', 'deleted_at'),
+    )
+    
+    def __repr__(self):
+        return f'<SellerCropDeletion {self.seller_crop_id}>'
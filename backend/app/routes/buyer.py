@@ -1,9 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from app.models import SellerCrop, Seller, Province, District, City
-import joblib
-import pandas as pd
-import os
+from app.utils.crop_availability import with_availability
+from app.utils.crop_catalog import crop_name_filter
+from app.utils.dashboard_stats import build_buyer_dashboard
+from app.utils.inference import bin_sample, encode_sample, score_sample
+from app.utils.model_registry import get_model, get_model_path
+from app.utils.pagination import get_page_args, listing_cursor_values, listing_sort_keys, paginate_keyset
+from app.utils.projections import listing_summary_options
 
 buyer_bp = Blueprint('buyer', __name__)
 
@@ -17,6 +21,29 @@ def recommend_crop():
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model(get_model_path('BUYER_MODEL_PATH'))
+        except FileNotFoundError:
+            return jsonify({
+                'success': False,
+                'message': 'ML model not found. Please ensure the model file exists.'
+            }), 500
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error loading ML model: {str(e)}'
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -30,61 +57,27 @@ def recommend_crop():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'crop_recommendation_model_new.pkl')
-        
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': 'ML model not found. Please ensure the model file exists.'
-            }), 500
-        
+        # Encode categorical features straight into the model's feature array
         try:
-            model_package = joblib.load(model_path)
-            model = model_package['model']
-            encoders = model_package['encoders']
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'message': f'Error loading ML model: {str(e)}'
-            }), 500
-        
-        # Create input dataframe with the exact column names expected by the model
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode categorical features
-        try:
-            for col in input_data.columns:
-                if col in encoders:
-                    input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
+            X_input = encode_sample(loaded_model.code_maps, data)
         except ValueError as e:
             return jsonify({
                 'success': False,
                 'message': f'Invalid input values. Please check your selections: {str(e)}'
             }), 400
         
-        # Select encoded features for prediction
-        feature_columns = [col + '_encoded' for col in input_data.columns if not col.endswith('_encoded')]
-        X_input = input_data[feature_columns]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
+        # Optional number of ranked crops to return with seller availability
+        top_n = data.get('top_n')
+        if top_n is not None and (not isinstance(top_n, int) or isinstance(top_n, bool) or top_n < 1):
+            return jsonify({
+                'success': False,
+                'message': 'top_n must be a positive integer'
+            }), 400
         
-        # Get prediction confidence if available
-        confidence = None
-        if hasattr(model, 'predict_proba'):
-            prediction_proba = model.predict_proba(X_input)[0]
-            confidence = max(prediction_proba)
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input, top_k=top_n or 3)
         
-        # Find sellers who have this recommended crop
+        # Find sellers who have this recommended crop, loading only the columns the response shows
         sellers_with_crop = get_db().session.query(
             SellerCrop, Seller, Province, District, City
         ).join(
@@ -95,8 +88,10 @@ def recommend_crop():
             District, Seller.district_id == District.id
         ).join(
             City, Seller.city_id == City.id
+        ).options(
+            *listing_summary_options()
         ).filter(
-            SellerCrop.crop_name.ilike(f'%{prediction}%'),
+            crop_name_filter(prediction),
             SellerCrop.is_available == True,
             Seller.is_active == True
         ).all()
@@ -137,12 +132,13 @@ def recommend_crop():
             }
             available_sellers.append(seller_info)
         
-        return jsonify({
+        response_data = {
             'success': True,
             'recommendation': {
                 'crop_name': prediction,
                 'confidence': round(confidence, 4) if confidence else None,
                 'confidence_percentage': round(confidence * 100, 2) if confidence else None,
+                'top_predictions': top_predictions,
                 'input_conditions': {
                     'nitrogen': data['nitrogen_level'],
                     'phosphorous': data['phosphorous_level'],
@@ -155,7 +151,13 @@ def recommend_crop():
             },
             'available_sellers': available_sellers,
             'sellers_count': len(available_sellers)
-        })
+        }
+        
+        # Seller counts and prices for the top N come from the shared availability aggregate
+        if top_n:
+            response_data['top_recommendations'] = with_availability(top_predictions)
+        
+        return jsonify(response_data)
         
     except Exception as e:
         return jsonify({
@@ -234,58 +236,10 @@ def get_crop_details(crop_id):
 def get_buyer_dashboard_stats():
     """Get statistics for buyer dashboard"""
     try:
-        # Get total number of active sellers
-        total_sellers = Seller.query.filter_by(is_active=True).count()
-        
-        # Get total number of available crops
-        total_crops = SellerCrop.query.filter_by(is_available=True).count()
-        
-        # Get unique crop types
-        unique_crop_types = get_db().session.query(SellerCrop.crop_name).filter_by(is_available=True).distinct().count()
-        
-        # Get verified sellers count
-        verified_sellers = Seller.query.filter_by(is_active=True, is_verified=True).count()
-        
-        # Get crop distribution (top 10 most available crops)
-        crop_distribution = get_db().session.query(
-            SellerCrop.crop_name,
-            get_db().func.count(SellerCrop.id).label('count')
-        ).filter_by(is_available=True).group_by(
-            SellerCrop.crop_name
-        ).order_by(
-            get_db().func.count(SellerCrop.id).desc()
-        ).limit(10).all()
-        
-        crop_stats = [{'crop_name': crop[0], 'availability_count': crop[1]} for crop in crop_distribution]
-        
-        # Get province-wise seller distribution
-        province_distribution = get_db().session.query(
-            Province.name,
-            get_db().func.count(Seller.id).label('seller_count')
-        ).join(
-            Seller, Province.id == Seller.province_id
-        ).filter(
-            Seller.is_active == True
-        ).group_by(
-            Province.name
-        ).order_by(
-            get_db().func.count(Seller.id).desc()
-        ).limit(10).all()
-        
-        province_stats = [{'province': prov[0], 'seller_count': prov[1]} for prov in province_distribution]
-        
+        # Served from the in-process stats store in a single read
         return jsonify({
             'success': True,
-            'dashboard_stats': {
-                'overview': {
-                    'total_sellers': total_sellers,
-                    'total_crops': total_crops,
-                    'unique_crop_types': unique_crop_types,
-                    'verified_sellers': verified_sellers
-                },
-                'crop_distribution': crop_stats,
-                'province_distribution': province_stats
-            }
+            'dashboard_stats': build_buyer_dashboard()
         })
         
     except Exception as e:
@@ -317,6 +271,8 @@ def search_crops():
             District, Seller.district_id == District.id
         ).join(
             City, Seller.city_id == City.id
+        ).options(
+            *listing_summary_options()
         ).filter(
             SellerCrop.is_available == True,
             Seller.is_active == True
@@ -324,7 +280,7 @@ def search_crops():
         
         # Apply filters
         if crop_name:
-            query = query.filter(SellerCrop.crop_name.ilike(f'%{crop_name}%'))
+            query = query.filter(crop_name_filter(crop_name))
         
         if province_id:
             query = query.filter(Seller.province_id == province_id)
@@ -341,8 +297,19 @@ def search_crops():
         if max_price:
             query = query.filter(SellerCrop.price_per_kg <= max_price)
         
-        # Execute query
-        results = query.all()
+        # Keyset pagination: every page costs the same as the first
+        cursor, limit, include_total = get_page_args()
+        try:
+            results, pagination = paginate_keyset(
+                query, listing_sort_keys(),
+                lambda row: listing_cursor_values(row[1], row[0]),
+                cursor, limit, include_total
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         # Format results
         crops = []
@@ -367,7 +334,8 @@ def search_crops():
         return jsonify({
             'success': True,
             'crops': crops,
-            'total_results': len(crops)
+            'total_results': len(crops),
+            'pagination': pagination
         })
         
     except Exception as e:
@@ -0,0 +1,35 @@
+from flask import Blueprint, jsonify
+from app import db
+from app.utils.model_registry import configured_model_paths, is_loaded
+from sqlalchemy import text
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/livez', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@health_bp.route('/readyz', methods=['GET'])
+def readiness():
+    """Readiness probe: a pooled database connection works and the ML model is loaded"""
+    checks = {}
+    
+    try:
+        db.session.execute(text('SELECT 1'))
+        checks['database'] = 'ok'
+    except Exception as e:
+        checks['database'] = f'error: {str(e)}'
+    finally:
+        # Hand the connection straight back to the pool
+        db.session.remove()
+    
+    # Loading is left to startup (wsgi.py preloads the model) and model reloads,
+    # so a probe never pays for a load or retries a broken model file
+    checks['model'] = 'ok' if all(is_loaded(path) for path in configured_model_paths()) else 'not loaded'
+    
+    ready = all(status == 'ok' for status in checks.values())
+    return jsonify({
+        'status': 'ready' if ready else 'not ready',
+        'checks': checks
+    }), 200 if ready else 503
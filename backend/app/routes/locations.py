@@ -1,16 +1,24 @@
-from flask import Blueprint, jsonify
-from app.models import Province, District, City
+from flask import Blueprint, current_app, jsonify, request
+from app.utils.location_cache import get_location_index
 
 locations_bp = Blueprint('locations', __name__)
 
+def cached_response(index, payload):
+    """JSON response tagged with the location index version, 304 if the client has it"""
+    response = jsonify(payload)
+    response.set_etag(index.version)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('LOCATION_CACHE_MAX_AGE', 300)
+    return response.make_conditional(request)
+
 @locations_bp.route('/provinces', methods=['GET'])
 def get_provinces():
     """Get all provinces"""
     try:
-        provinces = Province.query.order_by(Province.name).all()
-        return jsonify({
+        index = get_location_index()
+        return cached_response(index, {
             'success': True,
-            'provinces': [province.to_dict() for province in provinces]
+            'provinces': index.province_list
         })
     except Exception as e:
         return jsonify({
@@ -22,17 +30,16 @@ def get_provinces():
 def get_districts(province_id):
     """Get districts by province"""
     try:
-        province = Province.query.get(province_id)
-        if not province:
+        index = get_location_index()
+        if province_id not in index.provinces:
             return jsonify({
                 'success': False,
                 'message': 'Province not found'
             }), 404
         
-        districts = District.query.filter_by(province_id=province_id).order_by(District.name).all()
-        return jsonify({
+        return cached_response(index, {
             'success': True,
-            'districts': [district.to_dict() for district in districts]
+            'districts': index.districts_by_province[province_id]
         })
     except Exception as e:
         return jsonify({
@@ -44,17 +51,16 @@ def get_districts(province_id):
 def get_cities(district_id):
     """Get cities by district"""
     try:
-        district = District.query.get(district_id)
-        if not district:
+        index = get_location_index()
+        if district_id not in index.districts:
             return jsonify({
                 'success': False,
                 'message': 'District not found'
             }), 404
         
-        cities = City.query.filter_by(district_id=district_id).order_by(City.name).all()
-        return jsonify({
+        return cached_response(index, {
             'success': True,
-            'cities': [city.to_dict() for city in cities]
+            'cities': index.cities_by_district[district_id]
         })
     except Exception as e:
         return jsonify({
@@ -66,23 +72,20 @@ def get_cities(district_id):
 def get_location_info(city_id):
     """Get complete location information (city, district, province)"""
     try:
-        city = City.query.get(city_id)
-        if not city:
+        index = get_location_index()
+        location = index.location_info(city_id)
+        if not location:
             return jsonify({
                 'success': False,
                 'message': 'City not found'
             }), 404
         
-        return jsonify({
+        return cached_response(index, {
             'success': True,
-            'location': {
-                'city': city.to_dict(),
-                'district': city.district.to_dict(),
-                'province': city.district.province.to_dict()
-            }
+            'location': location
         })
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error fetching location info: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
@@ -1,35 +1,46 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from app import db
 from app.models import Province, District, City, Seller, SellerCrop, CropCultivation
-from sqlalchemy import func
-import joblib
-import pandas as pd
-import os
+from app.utils.crop_availability import with_availability
+from app.utils.crop_catalog import ML_CROP_TYPES, crop_name_filter, get_crop_index
+from app.utils.dashboard_stats import build_buyer_dashboard, get_dashboard_stats
+from app.utils.diagnostics import get_row_counts
+from app.utils.inference import bin_sample, encode_sample, recommend_batch, score_sample
+from app.utils.location_cache import get_location_index
+from app.utils.model_registry import get_model, loaded_models
+from app.utils.pagination import get_page_args, listing_cursor_values, listing_sort_keys, paginate_keyset
+from app.utils.projections import crop_summary_options, get_fields_arg, listing_summary_options, seller_summary_options
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+import csv
+import io
 
 main_bp = Blueprint('main', __name__)
 
-# List of all 122 crop types from ML model
-ML_CROP_TYPES = [
-    "almond", "amaranth", "apple", "apricot", "artichoke", "asparagus", "avocado", "bamboo", "banana", "barley",
-    "basil", "beetroot", "betel", "bilberry", "blackberry", "blackgram", "blueberry", "breadfruit", "broccoli", "buckwheat",
-    "cabbage", "carambola", "carrot", "cashew", "cassava", "cauliflower", "celery", "chard", "cherry", "chia",
-    "chickpea", "clementine", "coconut", "coffee", "cotton", "cranberry", "cucumber", "currant", "date", "dragonfruit",
-    "durian", "eggplant", "fig", "garlic", "ginger", "gooseberry", "grapes", "guava", "hazelnut", "hemp",
-    "jackfruit", "jambul", "jute", "kidneybeans", "kiwi", "leek", "lemongrass", "lentil", "lettuce", "longan",
-    "lychee", "macadamia", "maize", "mandarin", "mango", "mangosteen", "melon", "millet", "mint", "mothbeans",
-    "mulberry", "mungbean", "muskmelon", "nectarine", "oats", "okra", "olive", "onion", "orange", "papaya",
-    "parsley", "passionfruit", "peach", "pear", "peas", "pecan", "persimmon", "pigeonpeas", "pistachio", "plantain",
-    "plum", "pomegranate", "pomelo", "pumpkin", "quince", "radish", "rambutan", "raspberry", "rice", "rye",
-    "salak", "sapodilla", "sorghum", "soursop", "soybean", "spinach", "starfruit", "strawberry", "sunflower", "sweetpotato",
-    "tamarind", "tangelo", "taro", "teff", "tomato", "turmeric", "turnip", "walnut", "watermelon", "wheat", "yam", "zucchini"
-]
-
 @main_bp.route('/test-crop', methods=['POST'])
 def test_crop_endpoint():
     """Working crop recommendation endpoint"""
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model()
+        except FileNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -43,48 +54,11 @@ def test_crop_endpoint():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(__file__), 'crop_recommendation_model.pkl')
-        
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': f'ML model not found at: {model_path}'
-            }), 500
-        
-        # Load model and make prediction
-        model_package = joblib.load(model_path)
-        model = model_package['model']
-        encoders = model_package['encoders']
-        
-        # Prepare input data
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode features
-        for col in input_data.columns:
-            if col in encoders:
-                input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
-        
-        # Prepare features for prediction
-        feature_cols = [col + '_encoded' for col in ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 'humidity_cat', 'ph_cat', 'rainfall_cat']]
-        X_input = input_data[feature_cols]
+        # Encode features straight into the model's feature array
+        X_input = encode_sample(loaded_model.code_maps, data)
         
-        # Make prediction
-        prediction = model.predict(X_input)[0]
-        
-        # Get confidence
-        confidence = 0.0
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X_input)[0]
-            confidence = float(max(probabilities))
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input)
         
         return jsonify({
             'success': True,
@@ -92,7 +66,8 @@ def test_crop_endpoint():
             'recommendation': {
                 'crop': prediction,
                 'confidence': confidence,
-                'confidence_percentage': round(confidence * 100, 2)
+                'confidence_percentage': round(confidence * 100, 2),
+                'top_predictions': top_predictions
             },
             'input_conditions': {
                 'nitrogen': data['nitrogen_level'],
@@ -116,22 +91,13 @@ def health_check():
     """Health check endpoint"""
     try:
         # Check database connectivity
-        total_provinces = Province.query.count()
-        total_districts = District.query.count()
-        total_cities = City.query.count()
-        total_sellers = Seller.query.count()
-        total_crops = SellerCrop.query.count()
+        db.session.execute(text('SELECT 1'))
         
         return jsonify({
             'status': 'healthy',
             'message': 'API is running properly',
             'database': {
-                'connected': True,
-                'total_provinces': total_provinces,
-                'total_districts': total_districts,
-                'total_cities': total_cities,
-                'total_sellers': total_sellers,
-                'total_crops': total_crops
+                'connected': True
             }
         })
     except Exception as e:
@@ -143,6 +109,45 @@ def health_check():
             }
         }), 500
 
+@main_bp.route('/diagnostics', methods=['GET'])
+def get_diagnostics():
+    """Get table row counts and loaded models, counts cached for DIAGNOSTICS_TTL seconds"""
+    try:
+        return jsonify({
+            'success': True,
+            'database': get_row_counts(),
+            'loaded_models': loaded_models()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching diagnostics: {str(e)}'
+        }), 500
+
+@main_bp.route('/model/info', methods=['GET'])
+def get_model_info():
+    """Get metadata for the shared ML model"""
+    try:
+        loaded_model = get_model()
+        
+        return jsonify({
+            'success': True,
+            'model': loaded_model.to_dict(),
+            'loaded_models': loaded_models()
+        })
+        
+    except FileNotFoundError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching model info: {str(e)}'
+        }), 500
+
 @main_bp.route('/find-sellers/<crop_name>', methods=['GET'])
 def find_sellers(crop_name):
     """Find sellers for a specific crop"""
@@ -154,11 +159,29 @@ def find_sellers(crop_name):
         organic_only = request.args.get('organic_only', 'false').lower() == 'true'
         verified_only = request.args.get('verified_only', 'true').lower() == 'true'
         
+        try:
+            fields = get_fields_arg()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Build base query
-        query = db.session.query(Seller, SellerCrop, CropCultivation) \
-            .join(SellerCrop, Seller.id == SellerCrop.seller_id) \
-            .outerjoin(CropCultivation, SellerCrop.id == CropCultivation.seller_crop_id) \
-            .filter(SellerCrop.crop_name.ilike(f'%{crop_name}%')) \
+        if fields == 'full':
+            # Seller locations are joined into the same query instead of lazy loaded per row
+            query = db.session.query(Seller, SellerCrop, CropCultivation) \
+                .join(SellerCrop, Seller.id == SellerCrop.seller_id) \
+                .outerjoin(CropCultivation, SellerCrop.id == CropCultivation.seller_crop_id) \
+                .options(joinedload(Seller.province), joinedload(Seller.district), joinedload(Seller.city))
+        else:
+            # Summary columns only; location names come from the in-process location index
+            query = db.session.query(Seller, SellerCrop) \
+                .join(SellerCrop, Seller.id == SellerCrop.seller_id) \
+                .options(*listing_summary_options())
+        
+        query = query \
+            .filter(crop_name_filter(crop_name)) \
             .filter(SellerCrop.is_available == True) \
             .filter(Seller.is_active == True)
         
@@ -178,28 +201,49 @@ def find_sellers(crop_name):
         if city_id:
             query = query.filter(Seller.city_id == city_id)
         
-        results = query.all()
+        # Keyset pagination: every page costs the same as the first
+        cursor, limit, include_total = get_page_args()
+        try:
+            results, pagination = paginate_keyset(
+                query, listing_sort_keys(),
+                lambda row: listing_cursor_values(row[0], row[1]),
+                cursor, limit, include_total
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         if not results:
             return jsonify({
                 'success': True,
                 'message': 'No sellers found for the specified criteria',
-                'sellers': []
+                'sellers': [],
+                'pagination': pagination
             })
         
         # Format results
         sellers_list = []
-        for seller, crop, cultivation in results:
-            seller_data = seller.to_dict()
-            seller_data['crop'] = crop.to_dict()
-            if cultivation:
-                seller_data['crop']['cultivation'] = cultivation.to_dict()
-            sellers_list.append(seller_data)
+        if fields == 'full':
+            for seller, crop, cultivation in results:
+                seller_data = seller.to_dict()
+                seller_data['crop'] = crop.to_dict()
+                if cultivation:
+                    seller_data['crop']['cultivation'] = cultivation.to_dict()
+                sellers_list.append(seller_data)
+        else:
+            locations = get_location_index()
+            for seller, crop in results:
+                seller_data = seller.to_summary_dict(locations)
+                seller_data['crop'] = crop.to_summary_dict()
+                sellers_list.append(seller_data)
         
         return jsonify({
             'success': True,
             'sellers': sellers_list,
-            'total_found': len(sellers_list)
+            'total_found': len(sellers_list),
+            'pagination': pagination
         })
         
     except Exception as e:
@@ -218,8 +262,7 @@ def search_crops():
         district_id = request.args.get('district_id', type=int)
         organic_only = request.args.get('organic_only', 'false').lower() == 'true'
         available_only = request.args.get('available_only', 'true').lower() == 'true'
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        cursor, per_page, include_total = get_page_args()
         
         if not search_term:
             return jsonify({
@@ -227,12 +270,25 @@ def search_crops():
                 'message': 'Search term is required'
             }), 400
         
+        try:
+            fields = get_fields_arg()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Build query
+        # Summary columns only unless the full crop is asked for; seller location names come from the location index
         query = db.session.query(SellerCrop, Seller) \
             .join(Seller, SellerCrop.seller_id == Seller.id) \
-            .filter(SellerCrop.crop_name.ilike(f'%{search_term}%')) \
+            .options(seller_summary_options()) \
+            .filter(crop_name_filter(search_term)) \
             .filter(Seller.is_active == True)
         
+        if fields == 'summary':
+            query = query.options(crop_summary_options())
+        
         if available_only:
             query = query.filter(SellerCrop.is_available == True)
         
@@ -245,25 +301,33 @@ def search_crops():
         if district_id:
             query = query.filter(Seller.district_id == district_id)
         
-        # Apply pagination
-        paginated_results = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # Keyset pagination: no COUNT(*) or OFFSET, deep pages cost the same as the first
+        try:
+            results, pagination = paginate_keyset(
+                query, listing_sort_keys(),
+                lambda row: listing_cursor_values(row[1], row[0]),
+                cursor, per_page, include_total
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         # Format results
+        locations = get_location_index()
+        name = lambda item: item['name'] if item else None
         crops = []
-        for crop, seller in paginated_results.items:
-            crop_data = crop.to_dict()
+        for crop, seller in results:
+            crop_data = crop.to_dict() if fields == 'full' else crop.to_summary_dict()
             crop_data['seller'] = {
                 'id': seller.id,
                 'business_name': seller.business_name,
                 'shop_name': seller.shop_name,
                 'location': {
-                    'province': seller.province.name,
-                    'district': seller.district.name,
-                    'city': seller.city.name
+                    'province': name(locations.provinces.get(seller.province_id)),
+                    'district': name(locations.districts.get(seller.district_id)),
+                    'city': name(locations.cities.get(seller.city_id))
                 },
                 'contact_number': seller.contact_number,
                 'is_verified': seller.is_verified
@@ -273,14 +337,7 @@ def search_crops():
         return jsonify({
             'success': True,
             'crops': crops,
-            'pagination': {
-                'current_page': page,
-                'per_page': per_page,
-                'total_pages': paginated_results.pages,
-                'total_items': paginated_results.total,
-                'has_next': paginated_results.has_next,
-                'has_prev': paginated_results.has_prev
-            }
+            'pagination': pagination
         })
         
     except Exception as e:
@@ -317,12 +374,57 @@ def get_crop_types():
             'message': f'Error fetching crop types: {str(e)}'
         }), 500
 
+@main_bp.route('/crops/suggest', methods=['GET'])
+def suggest_crops():
+    """Suggest catalog crops by prefix or fuzzy match"""
+    try:
+        search_term = request.args.get('q', '').strip()
+        limit = request.args.get('limit', 10, type=int)
+        
+        if not search_term:
+            return jsonify({
+                'success': False,
+                'message': 'Search term is required'
+            }), 400
+        
+        suggestions = get_crop_index().search(search_term, limit=max(1, min(limit, 50)))
+        
+        return jsonify({
+            'success': True,
+            'crops': suggestions,
+            'total': len(suggestions)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error suggesting crops: {str(e)}'
+        }), 500
+
 @main_bp.route('/recommend-crop', methods=['POST'])
 def recommend_crop_direct():
     """Direct crop recommendation endpoint"""
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model()
+        except FileNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -336,48 +438,11 @@ def recommend_crop_direct():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(__file__), 'crop_recommendation_model.pkl')
+        # Encode features straight into the model's feature array
+        X_input = encode_sample(loaded_model.code_maps, data)
         
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': f'ML model not found at: {model_path}'
-            }), 500
-        
-        # Load model and make prediction
-        model_package = joblib.load(model_path)
-        model = model_package['model']
-        encoders = model_package['encoders']
-        
-        # Prepare input data
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode features
-        for col in input_data.columns:
-            if col in encoders:
-                input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
-        
-        # Prepare features for prediction
-        feature_cols = [col + '_encoded' for col in ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 'humidity_cat', 'ph_cat', 'rainfall_cat']]
-        X_input = input_data[feature_cols]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
-        
-        # Get confidence
-        confidence = 0.0
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X_input)[0]
-            confidence = float(max(probabilities))
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input)
         
         return jsonify({
             'success': True,
@@ -385,7 +450,8 @@ def recommend_crop_direct():
             'recommendation': {
                 'crop': prediction,
                 'confidence': confidence,
-                'confidence_percentage': round(confidence * 100, 2)
+                'confidence_percentage': round(confidence * 100, 2),
+                'top_predictions': top_predictions
             },
             'input_conditions': {
                 'nitrogen': data['nitrogen_level'],
@@ -404,23 +470,83 @@ def recommend_crop_direct():
             'message': f'Error generating recommendation: {str(e)}'
         }), 500
 
+@main_bp.route('/recommend-crop/batch', methods=['POST'])
+def recommend_crop_batch():
+    """Crop recommendations for many soil samples in one request"""
+    try:
+        top_k = request.args.get('top_k', 3, type=int)
+        
+        # Accept a CSV body or a JSON array (optionally wrapped in {"samples": [...]})
+        if request.mimetype == 'text/csv':
+            reader = csv.DictReader(io.StringIO(request.get_data(as_text=True)))
+            samples = [
+                {key.strip(): (value or '').strip() for key, value in row.items() if key}
+                for row in reader
+            ]
+        else:
+            data = request.get_json(silent=True)
+            samples = data.get('samples') if isinstance(data, dict) else data
+        
+        if not isinstance(samples, list) or not samples:
+            return jsonify({
+                'success': False,
+                'message': 'Request body must be a non-empty JSON array or CSV of samples'
+            }), 400
+        
+        max_batch_size = current_app.config['MAX_BATCH_SIZE']
+        if len(samples) > max_batch_size:
+            return jsonify({
+                'success': False,
+                'message': f'Batch too large: {len(samples)} samples (maximum {max_batch_size})'
+            }), 400
+        
+        # Get the shared ML model
+        try:
+            loaded_model = get_model()
+        except FileNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
+        
+        results = recommend_batch(loaded_model, samples, top_k)
+        successful_rows = sum(1 for result in results if result['success'])
+        
+        return jsonify({
+            'success': True,
+            'message': f'Generated {successful_rows} of {len(results)} recommendations',
+            'results': results,
+            'total_rows': len(results),
+            'successful_rows': successful_rows,
+            'failed_rows': len(results) - successful_rows
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error generating batch recommendations: {str(e)}'
+        }), 500
+
 @main_bp.route('/stats', methods=['GET'])
 def get_stats():
     """Get application statistics"""
     try:
+        # Counts come from the in-process stats store and location index, not COUNT(*) queries
+        dashboard_stats = get_dashboard_stats()
+        locations = get_location_index()
         stats = {
-            'provinces': Province.query.count(),
-            'districts': District.query.count(),
-            'cities': City.query.count(),
+            'provinces': len(locations.provinces),
+            'districts': len(locations.districts),
+            'cities': len(locations.cities),
             'sellers': {
-                'total': Seller.query.count(),
-                'verified': Seller.query.filter_by(is_verified=True).count(),
-                'active': Seller.query.filter_by(is_active=True).count()
+                'total': dashboard_stats['sellers']['total'],
+                'verified': dashboard_stats['sellers']['verified'],
+                'active': dashboard_stats['sellers']['active']
             },
             'crops': {
-                'total': SellerCrop.query.count(),
-                'available': SellerCrop.query.filter_by(is_available=True).count(),
-                'organic': SellerCrop.query.filter_by(organic_certified=True).count(),
+                'total': dashboard_stats['crops']['total'],
+                'available': dashboard_stats['crops']['available'],
+                'organic': dashboard_stats['crops']['organic'],
                 'ml_types_available': len(ML_CROP_TYPES)
             }
         }
@@ -441,58 +567,10 @@ def get_stats():
 def get_buyer_dashboard_stats():
     """Get statistics for buyer dashboard"""
     try:
-        # Get total number of active sellers
-        total_sellers = Seller.query.filter_by(is_active=True).count()
-        
-        # Get total number of available crops
-        total_crops = SellerCrop.query.filter_by(is_available=True).count()
-        
-        # Get unique crop types
-        unique_crop_types = db.session.query(SellerCrop.crop_name).filter_by(is_available=True).distinct().count()
-        
-        # Get verified sellers count
-        verified_sellers = Seller.query.filter_by(is_active=True, is_verified=True).count()
-        
-        # Get crop distribution (top 10 most available crops)
-        crop_distribution = db.session.query(
-            SellerCrop.crop_name,
-            func.count(SellerCrop.id).label('count')
-        ).filter_by(is_available=True).group_by(
-            SellerCrop.crop_name
-        ).order_by(
-            func.count(SellerCrop.id).desc()
-        ).limit(10).all()
-        
-        crop_stats = [{'crop_name': crop[0], 'availability_count': crop[1]} for crop in crop_distribution]
-        
-        # Get province-wise seller distribution
-        province_distribution = db.session.query(
-            Province.name,
-            func.count(Seller.id).label('seller_count')
-        ).join(
-            Seller, Province.id == Seller.province_id
-        ).filter(
-            Seller.is_active == True
-        ).group_by(
-            Province.name
-        ).order_by(
-            func.count(Seller.id).desc()
-        ).limit(10).all()
-        
-        province_stats = [{'province': prov[0], 'seller_count': prov[1]} for prov in province_distribution]
-        
+        # Served from the in-process stats store in a single read
         return jsonify({
             'success': True,
-            'dashboard_stats': {
-                'overview': {
-                    'total_sellers': total_sellers,
-                    'total_crops': total_crops,
-                    'unique_crop_types': unique_crop_types,
-                    'verified_sellers': verified_sellers
-                },
-                'crop_distribution': crop_stats,
-                'province_distribution': province_stats
-            }
+            'dashboard_stats': build_buyer_dashboard()
         })
         
     except Exception as e:
@@ -516,6 +594,24 @@ def recommend_crop():
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model()
+        except FileNotFoundError:
+            return jsonify({
+                'success': False,
+                'message': 'ML model not found. Please ensure the model file exists.'
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -529,55 +625,19 @@ def recommend_crop():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(__file__), 'crop_recommendation_model.pkl')
+        # Encode features straight into the model's feature array
+        X_input = encode_sample(loaded_model.code_maps, data)
         
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': 'ML model not found. Please ensure the model file exists.'
-            }), 500
-        
-        # Load model and make prediction
-        model_package = joblib.load(model_path)
-        model = model_package['model']
-        encoders = model_package['encoders']
-        
-        # Prepare input data
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode features
-        for col in input_data.columns:
-            if col in encoders:
-                input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
-        
-        # Prepare features for prediction
-        feature_cols = [col + '_encoded' for col in ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 'humidity_cat', 'ph_cat', 'rainfall_cat']]
-        X_input = input_data[feature_cols]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
-        
-        # Get confidence
-        confidence = 0.0
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X_input)[0]
-            confidence = float(max(probabilities))
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input)
         
         return jsonify({
             'success': True,
             'message': 'Crop recommendation generated successfully!',
             'recommendation': {
                 'crop': prediction,
-                'confidence': confidence
+                'confidence': confidence,
+                'top_predictions': top_predictions
             }
         })
         
@@ -593,6 +653,29 @@ def recommend_crop_full():
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model()
+        except FileNotFoundError:
+            return jsonify({
+                'success': False,
+                'message': 'ML model not found. Please ensure the model file exists.'
+            }), 500
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error loading ML model: {str(e)}'
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -606,61 +689,27 @@ def recommend_crop_full():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(__file__), 'crop_recommendation_model.pkl')
-        
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': 'ML model not found. Please ensure the model file exists.'
-            }), 500
-        
+        # Encode categorical features straight into the model's feature array
         try:
-            model_package = joblib.load(model_path)
-            model = model_package['model']
-            encoders = model_package['encoders']
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'message': f'Error loading ML model: {str(e)}'
-            }), 500
-        
-        # Create input dataframe with the exact column names expected by the model
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode categorical features
-        try:
-            for col in input_data.columns:
-                if col in encoders:
-                    input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
+            X_input = encode_sample(loaded_model.code_maps, data)
         except ValueError as e:
             return jsonify({
                 'success': False,
                 'message': f'Invalid input values. Please check your selections: {str(e)}'
             }), 400
         
-        # Select encoded features for prediction
-        feature_columns = [col + '_encoded' for col in input_data.columns if not col.endswith('_encoded')]
-        X_input = input_data[feature_columns]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
+        # Optional number of ranked crops to return with seller availability
+        top_n = data.get('top_n')
+        if top_n is not None and (not isinstance(top_n, int) or isinstance(top_n, bool) or top_n < 1):
+            return jsonify({
+                'success': False,
+                'message': 'top_n must be a positive integer'
+            }), 400
         
-        # Get prediction confidence if available
-        confidence = None
-        if hasattr(model, 'predict_proba'):
-            prediction_proba = model.predict_proba(X_input)[0]
-            confidence = max(prediction_proba)
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input, top_k=top_n or 3)
         
-        # Find sellers who have this recommended crop
+        # Find sellers who have this recommended crop, loading only the columns the response shows
         sellers_with_crop = db.session.query(
             SellerCrop, Seller, Province, District, City
         ).join(
@@ -671,8 +720,10 @@ def recommend_crop_full():
             District, Seller.district_id == District.id
         ).join(
             City, Seller.city_id == City.id
+        ).options(
+            *listing_summary_options()
         ).filter(
-            SellerCrop.crop_name.ilike(f'%{prediction}%'),
+            crop_name_filter(prediction),
             SellerCrop.is_available == True,
             Seller.is_active == True
         ).all()
@@ -713,12 +764,13 @@ def recommend_crop_full():
             }
             available_sellers.append(seller_info)
         
-        return jsonify({
+        response_data = {
             'success': True,
             'recommendation': {
                 'crop_name': prediction,
                 'confidence': round(confidence, 4) if confidence else None,
                 'confidence_percentage': round(confidence * 100, 2) if confidence else None,
+                'top_predictions': top_predictions,
                 'input_conditions': {
                     'nitrogen': data['nitrogen_level'],
                     'phosphorous': data['phosphorous_level'],
@@ -731,7 +783,13 @@ def recommend_crop_full():
             },
             'available_sellers': available_sellers,
             'sellers_count': len(available_sellers)
-        })
+        }
+        
+        # Seller counts and prices for the top N come from the shared availability aggregate
+        if top_n:
+            response_data['top_recommendations'] = with_availability(top_predictions)
+        
+        return jsonify(response_data)
         
     except Exception as e:
         return jsonify({
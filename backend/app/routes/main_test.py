@@ -1,7 +1,6 @@
 from flask import Blueprint, jsonify, request
-import joblib
-import pandas as pd
-import os
+from app.utils.inference import bin_sample, encode_sample, score_sample
+from app.utils.model_registry import get_model, get_model_path
 
 main_test_bp = Blueprint('main_test', __name__)
 
@@ -16,6 +15,24 @@ def recommend_crop_test():
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model(get_model_path('TEST_MODEL_PATH'))
+        except FileNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
+
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -29,55 +46,19 @@ def recommend_crop_test():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
 
-        # Load the ML model
-        model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'crop_recommendation_model.pkl')
-        
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': f'ML model not found at: {model_path}'
-            }), 500
-
-        # Load model and make prediction
-        model_package = joblib.load(model_path)
-        model = model_package['model']
-        encoders = model_package['encoders']
-        
-        # Prepare input data
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode features
-        for col in input_data.columns:
-            if col in encoders:
-                input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
-        
-        # Prepare features for prediction
-        feature_cols = [col + '_encoded' for col in ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 'humidity_cat', 'ph_cat', 'rainfall_cat']]
-        X_input = input_data[feature_cols]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
+        # Encode features straight into the model's feature array
+        X_input = encode_sample(loaded_model.code_maps, data)
         
-        # Get confidence
-        confidence = 0.0
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X_input)[0]
-            confidence = float(max(probabilities))
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input)
         
         return jsonify({
             'success': True,
             'message': 'Crop recommendation generated successfully!',
             'recommendation': {
                 'crop': prediction,
-                'confidence': confidence
+                'confidence': confidence,
+                'top_predictions': top_predictions
             }
         })
         
@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app import db
-from app.models import User, Seller, SellerCrop, CropCultivation, Province, District, City
+from app.models import User, Seller, SellerCrop, CropCultivation
+from app.utils.inventory_import import import_inventory, read_csv_rows, read_ndjson_rows
+from app.utils.inventory_sync import apply_inventory_patch, get_changes
+from app.utils.location_cache import get_location_index
+from app.utils.projections import crop_summary_options, get_fields_arg
+from app.utils.seller_dashboard import get_seller_dashboard as get_seller_dashboard_data
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 import json
 
 seller_bp = Blueprint('seller', __name__)
@@ -8,55 +15,12 @@ seller_bp = Blueprint('seller', __name__)
 @seller_bp.route('/dashboard/<seller_id>', methods=['GET'])
 def get_seller_dashboard(seller_id):
     try:
-        # Get seller info
-        seller_info = Seller.query.get(seller_id)
+        # Seller info, crop statistics and recent crops come from one query, cached per seller
+        dashboard_data = get_seller_dashboard_data(seller_id)
         
-        if not seller_info:
+        if not dashboard_data:
             return jsonify({'success': False, 'message': 'Seller not found'}), 404
         
-        # Get crop statistics
-        total_crops = SellerCrop.query.filter_by(seller_id=seller_id).count()
-        available_crops = SellerCrop.query.filter_by(seller_id=seller_id, is_available=True).count()
-        # Calculate total quantity manually to avoid query issues
-        available_crop_objects = SellerCrop.query.filter_by(seller_id=seller_id, is_available=True).all()
-        total_quantity = sum(crop.quantity_available or 0 for crop in available_crop_objects)
-        
-        # Get recent crops
-        recent_crops = SellerCrop.query.filter_by(seller_id=seller_id).order_by(
-            SellerCrop.created_at.desc()
-        ).limit(5).all()
-        
-        recent_crops_data = []
-        for crop in recent_crops:
-            recent_crops_data.append({
-                'id': crop.id,
-                'crop_name': crop.crop_name,
-                'price_per_kg': crop.price_per_kg,
-                'quantity_available': crop.quantity_available,
-                'is_available': crop.is_available,
-                'created_at': crop.created_at.isoformat() if crop.created_at else None
-            })
-        
-        dashboard_data = {
-            'seller_info': {
-                'id': seller_info.id,
-                'business_name': seller_info.business_name,
-                'contact_number': seller_info.contact_number,
-                'address': seller_info.address_line_1,
-                'location': {
-                    'province': seller_info.province.name if seller_info.province else None,
-                    'district': seller_info.district.name if seller_info.district else None,
-                    'city': seller_info.city.name if seller_info.city else None
-                }
-            },
-            'statistics': {
-                'total_crops': total_crops,
-                'available_crops': available_crops,
-                'total_quantity': total_quantity
-            },
-            'recent_crops': recent_crops_data
-        }
-        
         return jsonify({
             'success': True,
             'dashboard': dashboard_data
@@ -93,22 +57,12 @@ def register_business():
                 'message': 'Email address already registered'
             }), 409
         
-        # Validate location IDs
-        province = Province.query.get(data['province_id'])
-        district = District.query.get(data['district_id'])
-        city = City.query.get(data['city_id'])
-        
-        if not province or not district or not city:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid location IDs provided'
-            }), 400
-        
-        # Validate location hierarchy
-        if district.province_id != province.id or city.district_id != district.id:
+        # Validate location IDs and hierarchy against the cached location tree
+        location_error = get_location_index().validate_hierarchy(data['province_id'], data['district_id'], data['city_id'])
+        if location_error:
             return jsonify({
                 'success': False,
-                'message': 'Location hierarchy mismatch'
+                'message': location_error
             }), 400
         
         # Create user account first
@@ -247,21 +201,12 @@ def update_seller_profile(user_id):
             district_id = data.get('district_id', seller.district_id)
             city_id = data.get('city_id', seller.city_id)
             
-            # Validate location hierarchy
-            province = Province.query.get(province_id)
-            district = District.query.get(district_id)
-            city = City.query.get(city_id)
-            
-            if not province or not district or not city:
-                return jsonify({
-                    'success': False,
-                    'message': 'Invalid location IDs provided'
-                }), 400
-            
-            if district.province_id != province.id or city.district_id != district.id:
+            # Validate location hierarchy against the cached location tree
+            location_error = get_location_index().validate_hierarchy(province_id, district_id, city_id)
+            if location_error:
                 return jsonify({
                     'success': False,
-                    'message': 'Location hierarchy mismatch'
+                    'message': location_error
                 }), 400
             
             seller.province_id = province_id
@@ -377,22 +322,92 @@ def add_crop():
             'message': f'Failed to add crop: {str(e)}'
         }), 500
 
+@seller_bp.route('/crops/bulk', methods=['POST'])
+def bulk_import_crops():
+    """Insert or update many crops for a seller from a CSV or NDJSON upload"""
+    try:
+        seller_id = request.args.get('seller_id')
+        if not seller_id:
+            return jsonify({
+                'success': False,
+                'message': 'Missing required query parameter: seller_id'
+            }), 400
+        
+        seller = db.session.get(Seller, seller_id)
+        if not seller:
+            return jsonify({
+                'success': False,
+                'message': 'Seller not found'
+            }), 404
+        
+        if request.mimetype == 'text/csv':
+            rows = read_csv_rows(request.stream)
+        elif request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            rows = read_ndjson_rows(request.stream)
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Send the crops as text/csv or application/x-ndjson'
+            }), 415
+        
+        # Rows are validated as they stream in; nothing is written if the upload is rejected
+        try:
+            report = import_inventory(seller_id, rows, current_app.config.get('MAX_BULK_IMPORT_ROWS', 50000))
+        except (ValueError, UnicodeDecodeError) as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except RuntimeError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': f"Imported {report['inserted'] + report['updated']} of {report['total_rows']} rows",
+            **report
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Failed to import crops: {str(e)}'
+        }), 500
+
 @seller_bp.route('/crops/<seller_id>', methods=['GET'])
 def get_seller_crops(seller_id):
     """Get all crops for a seller"""
     try:
-        seller = Seller.query.get(seller_id)
+        try:
+            fields = get_fields_arg()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        seller = db.session.get(Seller, seller_id, options=[load_only(Seller.id)])
         if not seller:
             return jsonify({
                 'success': False,
                 'message': 'Seller not found'
             }), 404
         
-        crops = SellerCrop.query.filter_by(seller_id=seller_id).all()
+        if fields == 'full':
+            # Cultivation details for every crop in one more query, not one per crop
+            crops = SellerCrop.query.filter_by(seller_id=seller_id).options(selectinload(SellerCrop.cultivation_info)).all()
+            crops_data = [crop.to_dict(include_cultivation=True) for crop in crops]
+        else:
+            crops = SellerCrop.query.filter_by(seller_id=seller_id).options(crop_summary_options()).all()
+            crops_data = [crop.to_summary_dict() for crop in crops]
         
         return jsonify({
             'success': True,
-            'crops': [crop.to_dict(include_cultivation=True) for crop in crops]
+            'crops': crops_data
         })
         
     except Exception as e:
@@ -401,6 +416,72 @@ def get_seller_crops(seller_id):
             'message': f'Error fetching crops: {str(e)}'
         }), 500
 
+@seller_bp.route('/crops/<seller_id>/changes', methods=['GET'])
+def get_seller_crop_changes(seller_id):
+    """Get a seller's crops changed or deleted since a sync token"""
+    try:
+        max_size = current_app.config.get('MAX_CHANGES_PAGE_SIZE', 1000)
+        limit = min(max(request.args.get('limit', max_size, type=int), 1), max_size)
+        
+        try:
+            changes = get_changes(seller_id, request.args.get('since'), limit, current_app.config.get('SYNC_LAG_SECONDS', 5))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            **changes
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching crop changes: {str(e)}'
+        }), 500
+
+@seller_bp.route('/crops/<seller_id>/inventory', methods=['PATCH'])
+def patch_seller_inventory(seller_id):
+    """Update prices, stock and availability of many crops, each at the version it was read at"""
+    try:
+        data = request.get_json(silent=True) or {}
+        updates = data.get('updates')
+        if not isinstance(updates, list) or not updates:
+            return jsonify({
+                'success': False,
+                'message': 'Send a non-empty updates list of {id, version, ...fields}'
+            }), 400
+        
+        max_updates = current_app.config.get('MAX_CHANGES_PAGE_SIZE', 1000)
+        if len(updates) > max_updates:
+            return jsonify({
+                'success': False,
+                'message': f'Too many updates, at most {max_updates} per request'
+            }), 400
+        
+        try:
+            report = apply_inventory_patch(seller_id, updates)
+        except RuntimeError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': f"Updated {report['applied']} of {len(updates)} crops",
+            **report
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Failed to update inventory: {str(e)}'
+        }), 500
+
 @seller_bp.route('/crops/<crop_id>', methods=['PUT'])
 def update_crop(crop_id):
     """Update crop information"""
@@ -414,6 +495,19 @@ def update_crop(crop_id):
         
         data = request.get_json()
         
+        # Optimistic concurrency: reject edits based on an older version of the crop.
+        # If-Match may be * or list several versions; without it the body's version is checked
+        if request.if_match:
+            stale = not request.if_match.contains_weak(str(crop.version))
+        else:
+            stale = data.get('version') is not None and str(data['version']) != str(crop.version)
+        if stale:
+            return jsonify({
+                'success': False,
+                'message': 'Crop was changed by another update',
+                'current_version': crop.version
+            }), 409
+        
         # Update crop fields
         updatable_fields = [
             'crop_name', 'crop_variety', 'is_available', 'price_per_kg', 
@@ -452,13 +546,24 @@ def update_crop(crop_id):
                 if field in cultivation_data:
                     setattr(cultivation, field, json.dumps(cultivation_data[field]) if cultivation_data[field] else None)
         
-        db.session.commit()
+        # The UPDATE only matches the version checked above, a concurrent write makes it stale
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': 'Crop was changed by another update',
+                'current_version': db.session.query(SellerCrop.version).filter_by(id=crop_id).scalar()
+            }), 409
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Crop updated successfully',
             'crop': crop.to_dict(include_cultivation=True)
         })
+        response.set_etag(str(crop.version))
+        return response
         
     except Exception as e:
         db.session.rollback()
@@ -479,7 +584,15 @@ def delete_crop(crop_id):
             }), 404
         
         db.session.delete(crop)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'message': 'Crop was changed by another update, reload it before deleting',
+                'current_version': db.session.query(SellerCrop.version).filter_by(id=crop_id).scalar()
+            }), 409
         
         return jsonify({
             'success': True,
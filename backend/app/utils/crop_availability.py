@@ -0,0 +1,106 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Crop, Seller, SellerCrop
+from app.utils.crop_catalog import normalize_crop_name
+
+# Per-crop seller availability, rebuilt from one grouped query when stale
+_snapshot = None
+_generation = 0
+_lock = threading.Lock()
+
+EMPTY_AVAILABILITY = {
+    'seller_count': 0,
+    'listing_count': 0,
+    'min_price_per_kg': None
+}
+
+def invalidate_crop_availability():
+    """Drop the availability snapshot so the next read rebuilds it"""
+    global _snapshot, _generation
+    with _lock:
+        _snapshot = None
+        _generation += 1
+
+def build_crop_availability():
+    """Get seller count, listing count and minimum price for every available catalog crop
+
+    Listings are grouped by their catalog crop, the same link the seller
+    search filters on, so 'Kidney Beans' listings count for 'kidneybeans'.
+    """
+    rows = db.session.query(
+        Crop.name,
+        func.count(func.distinct(SellerCrop.seller_id)),
+        func.count(SellerCrop.id),
+        func.min(SellerCrop.price_per_kg)
+    ).join(
+        Crop, SellerCrop.crop_id == Crop.id
+    ).join(
+        Seller, SellerCrop.seller_id == Seller.id
+    ).filter(
+        SellerCrop.is_available == True,
+        Seller.is_active == True
+    ).group_by(
+        Crop.name
+    ).all()
+
+    return {
+        crop_name: {
+            'seller_count': seller_count,
+            'listing_count': listing_count,
+            'min_price_per_kg': min_price
+        }
+        for crop_name, seller_count, listing_count, min_price in rows
+    }
+
+def get_availability_snapshot():
+    """Get the shared per-crop availability, rebuilding it when stale"""
+    global _snapshot
+
+    snapshot = _snapshot
+    ttl = current_app.config.get('CROP_AVAILABILITY_TTL', 60)
+    if snapshot is None or time.monotonic() - snapshot[0] > ttl:
+        generation = _generation
+        snapshot = (time.monotonic(), build_crop_availability())
+        with _lock:
+            # Keep the result only if no write was committed while building it
+            if generation == _generation:
+                _snapshot = snapshot
+
+    return snapshot[1]
+
+def get_crop_availability(crop_name):
+    """Get availability for one crop"""
+    return get_availability_snapshot().get(normalize_crop_name(crop_name), EMPTY_AVAILABILITY)
+
+def with_availability(predictions):
+    """Annotate ranked predictions with live seller availability"""
+    availability = get_availability_snapshot()
+    return [
+        dict(prediction, **availability.get(normalize_crop_name(prediction['crop']), EMPTY_AVAILABILITY))
+        for prediction in predictions
+    ]
+
+def mark_inventory_changed(session):
+    """Rebuild availability when the session commits, for bulk writes that skip the flush events"""
+    session.info['crop_availability_changed'] = True
+
+@event.listens_for(Session, 'after_flush')
+def _track_inventory_changes(session, flush_context):
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, (Seller, SellerCrop)) for obj in changed):
+        mark_inventory_changed(session)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('crop_availability_changed', False):
+        invalidate_crop_availability()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('crop_availability_changed', None)
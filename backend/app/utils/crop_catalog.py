@@ -0,0 +1,207 @@
+import re
+import threading
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Crop, SellerCrop
+
+# List of all 122 crop types from ML model
+ML_CROP_TYPES = [
+    "almond", "amaranth", "apple", "apricot", "artichoke", "asparagus", "avocado", "bamboo", "banana", "barley",
+    "basil", "beetroot", "betel", "bilberry", "blackberry", "blackgram", "blueberry", "breadfruit", "broccoli", "buckwheat",
+    "cabbage", "carambola", "carrot", "cashew", "cassava", "cauliflower", "celery", "chard", "cherry", "chia",
+    "chickpea", "clementine", "coconut", "coffee", "cotton", "cranberry", "cucumber", "currant", "date", "dragonfruit",
+    "durian", "eggplant", "fig", "garlic", "ginger", "gooseberry", "grapes", "guava", "hazelnut", "hemp",
+    "jackfruit", "jambul", "jute", "kidneybeans", "kiwi", "leek", "lemongrass", "lentil", "lettuce", "longan",
+    "lychee", "macadamia", "maize", "mandarin", "mango", "mangosteen", "melon", "millet", "mint", "mothbeans",
+    "mulberry", "mungbean", "muskmelon", "nectarine", "oats", "okra", "olive", "onion", "orange", "papaya",
+    "parsley", "passionfruit", "peach", "pear", "peas", "pecan", "persimmon", "pigeonpeas", "pistachio", "plantain",
+    "plum", "pomegranate", "pomelo", "pumpkin", "quince", "radish", "rambutan", "raspberry", "rice", "rye",
+    "salak", "sapodilla", "sorghum", "soursop", "soybean", "spinach", "starfruit", "strawberry", "sunflower", "sweetpotato",
+    "tamarind", "tangelo", "taro", "teff", "tomato", "turmeric", "turnip", "walnut", "watermelon", "wheat", "yam", "zucchini"
+]
+
+# Minimum share of the search term's trigrams a crop name must contain to count as a fuzzy match
+FUZZY_MATCH_THRESHOLD = 0.6
+
+_index = None
+_lock = threading.Lock()
+
+def normalize_crop_name(name):
+    """Get the catalog key for a crop name ('Sweet Potato' -> 'sweetpotato')"""
+    return re.sub(r'[^a-z0-9]', '', (name or '').lower())
+
+def trigrams(name):
+    return {name[i:i + 3] for i in range(len(name) - 2)} or {name}
+
+class CropNameIndex:
+    """In-memory prefix trie and trigram index over the crop catalog"""
+
+    def __init__(self, crops):
+        self.crops = {crop['name']: crop for crop in crops}
+        self.trie = {}
+        self.trigram_index = {}
+
+        for name in self.crops:
+            node = self.trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node['$'] = name
+
+            for gram in trigrams(name):
+                self.trigram_index.setdefault(gram, set()).add(name)
+
+    def get(self, name):
+        """Get the catalog entry for an exact (normalized) crop name"""
+        return self.crops.get(normalize_crop_name(name))
+
+    def prefix_matches(self, prefix):
+        """Get catalog names starting with prefix, in alphabetical order"""
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        names = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == '$':
+                    names.append(child)
+                else:
+                    stack.append(child)
+        return sorted(names)
+
+    def fuzzy_matches(self, term):
+        """Get catalog names sharing most of the term's trigrams, best first"""
+        grams = trigrams(term)
+        counts = {}
+        for gram in grams:
+            for name in self.trigram_index.get(gram, ()):
+                counts[name] = counts.get(name, 0) + 1
+
+        scored = [(count / len(grams), name) for name, count in counts.items() if count / len(grams) >= FUZZY_MATCH_THRESHOLD]
+        return [name for _, name in sorted(scored, key=lambda item: (-item[0], len(item[1]), item[1]))]
+
+    def search(self, term, limit=10):
+        """Get catalog entries for a search term: exact, then prefix, then fuzzy matches
+
+        limit=None returns every match.
+        """
+        term = normalize_crop_name(term)
+        if not term:
+            return []
+
+        if term in self.crops:
+            names = [term]
+        else:
+            names = self.prefix_matches(term) or self.fuzzy_matches(term)
+
+        return [self.crops[name] for name in names[:limit]]
+
+    def match_listing(self, crop_name):
+        """Get the catalog entry a listing's free-text name refers to, or None
+
+        'Rice (Samba)' and 'Red Lady Papaya' name a catalog crop in one of
+        their words, 'Kidney Beans' in two adjacent words. Whole words are
+        matched so 'Pineapple' does not become 'apple'; the longest match wins.
+        """
+        exact = self.get(crop_name)
+        if exact:
+            return exact
+
+        words = re.findall(r'[a-z0-9]+', (crop_name or '').lower())
+        spans = [
+            ''.join(words[start:end])
+            for start in range(len(words))
+            for end in range(start + 1, len(words) + 1)
+        ]
+        for span in sorted(spans, key=len, reverse=True):
+            if span in self.crops:
+                return self.crops[span]
+        return None
+
+def invalidate_crop_index():
+    """Drop the crop name index so the next read rebuilds it"""
+    global _index
+    with _lock:
+        _index = None
+
+def get_crop_index():
+    """Get the shared crop name index, building it from the catalog on first use"""
+    global _index
+
+    index = _index
+    if index is None:
+        with db.session.no_autoflush:
+            crops = [crop.to_dict() for crop in Crop.query.all()]
+        index = CropNameIndex(crops)
+        with _lock:
+            _index = index
+
+    return index
+
+def resolve_crop_id(crop_name):
+    """Get the catalog id for a listing's crop name, or None if it names no catalog crop"""
+    crop = get_crop_index().match_listing(crop_name)
+    return crop['id'] if crop else None
+
+def crop_name_filter(term):
+    """Get a SellerCrop filter for a search term, resolved through the catalog index"""
+    # Every matching crop, not the first page of suggestions
+    crop_ids = [crop['id'] for crop in get_crop_index().search(term, limit=None)]
+    if crop_ids:
+        return SellerCrop.crop_id.in_(crop_ids)
+
+    # Listings outside the catalog are still found by name
+    term = (term or '').strip()
+    return SellerCrop.crop_name.icontains(term, autoescape=True) if term else SellerCrop.crop_name == term
+
+def populate_crop_catalog():
+    """Populate the crop catalog with the ML model's crop types"""
+    existing = {crop.name for crop in Crop.query.all()}
+    for name in ML_CROP_TYPES:
+        if name not in existing:
+            db.session.add(Crop(name=name, display_name=name.replace('_', ' ').title()))
+    db.session.commit()
+
+def backfill_crop_ids():
+    """Link listings saved without a catalog id to their crop"""
+    index = get_crop_index()
+    updated = 0
+    for crop in SellerCrop.query.filter(SellerCrop.crop_id.is_(None)).all():
+        entry = index.match_listing(crop.crop_name)
+        if entry:
+            crop.crop_id = entry['id']
+            updated += 1
+    db.session.commit()
+    return updated
+
+@event.listens_for(Session, 'before_flush')
+def _link_listings_to_catalog(session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, SellerCrop) and obj.crop_id is None:
+            obj.crop_id = resolve_crop_id(obj.crop_name)
+
+    for obj in session.dirty:
+        if isinstance(obj, SellerCrop) and inspect(obj).attrs.crop_name.history.has_changes():
+            obj.crop_id = resolve_crop_id(obj.crop_name)
+
+@event.listens_for(Session, 'after_flush')
+def _track_catalog_changes(session, flush_context):
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, Crop) for obj in changed):
+        session.info['crop_catalog_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('crop_catalog_changed', False):
+        invalidate_crop_index()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('crop_catalog_changed', None)
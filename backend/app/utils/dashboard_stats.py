@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Seller, SellerCrop
+from app.utils.location_cache import get_location_index
+
+# Seller and listing counters, kept current from committed writes and
+# rebuilt from the database every DASHBOARD_STATS_RECONCILE_INTERVAL seconds
+_counters = None
+_reconciled_at = 0
+_generation = 0
+_lock = threading.Lock()
+
+def seller_contribution(is_active, is_verified, province_id):
+    """Get the counters one seller adds to the statistics"""
+    counters = Counter({'sellers.total': 1})
+    if is_active:
+        counters['sellers.active'] += 1
+        counters[('province', province_id)] += 1
+        if is_verified:
+            counters['sellers.active_verified'] += 1
+    if is_verified:
+        counters['sellers.verified'] += 1
+    return counters
+
+def crop_contribution(is_available, organic_certified, crop_name):
+    """Get the counters one listing adds to the statistics"""
+    counters = Counter({'crops.total': 1})
+    if is_available:
+        counters['crops.available'] += 1
+        counters[('crop', crop_name)] += 1
+    if organic_certified:
+        counters['crops.organic'] += 1
+    return counters
+
+CONTRIBUTIONS = {
+    Seller: (seller_contribution, ('is_active', 'is_verified', 'province_id')),
+    SellerCrop: (crop_contribution, ('is_available', 'organic_certified', 'crop_name'))
+}
+
+def build_counters():
+    """Count sellers and listings from the database with grouped queries"""
+    counters = Counter()
+
+    seller_rows = db.session.query(
+        Seller.is_active, Seller.is_verified, Seller.province_id, func.count(Seller.id)
+    ).group_by(Seller.is_active, Seller.is_verified, Seller.province_id).all()
+    for is_active, is_verified, province_id, count in seller_rows:
+        for key, value in seller_contribution(is_active, is_verified, province_id).items():
+            counters[key] += value * count
+
+    crop_rows = db.session.query(
+        SellerCrop.is_available, SellerCrop.organic_certified, SellerCrop.crop_name, func.count(SellerCrop.id)
+    ).group_by(SellerCrop.is_available, SellerCrop.organic_certified, SellerCrop.crop_name).all()
+    for is_available, organic_certified, crop_name, count in crop_rows:
+        for key, value in crop_contribution(is_available, organic_certified, crop_name).items():
+            counters[key] += value * count
+
+    return counters
+
+def reconcile_dashboard_stats():
+    """Rebuild the counters from the database, fixing any drift"""
+    global _counters, _reconciled_at
+
+    generation = _generation
+    counters = build_counters()
+    with _lock:
+        # A write committed while counting is already in the old counters, keep those
+        if generation == _generation or _counters is None:
+            _counters = counters
+            _reconciled_at = time.monotonic()
+
+def apply_delta(delta):
+    """Add committed changes to the counters"""
+    global _generation
+    with _lock:
+        _generation += 1
+        if _counters is not None:
+            _counters.update(delta)
+
+def get_dashboard_stats():
+    """Get a consistent copy of the counters, reconciling them when due"""
+    interval = current_app.config.get('DASHBOARD_STATS_RECONCILE_INTERVAL', 300)
+    if _counters is None or time.monotonic() - _reconciled_at > interval:
+        reconcile_dashboard_stats()
+
+    with _lock:
+        counters = Counter(_counters)
+
+    crop_counts = {key[1]: count for key, count in counters.items() if isinstance(key, tuple) and key[0] == 'crop' and count > 0}
+    province_counts = {key[1]: count for key, count in counters.items() if isinstance(key, tuple) and key[0] == 'province' and count > 0}
+
+    return {
+        'sellers': {
+            'total': counters['sellers.total'],
+            'active': counters['sellers.active'],
+            'verified': counters['sellers.verified'],
+            'active_verified': counters['sellers.active_verified']
+        },
+        'crops': {
+            'total': counters['crops.total'],
+            'available': counters['crops.available'],
+            'organic': counters['crops.organic'],
+            'unique_available': len(crop_counts)
+        },
+        'crop_counts': crop_counts,
+        'province_seller_counts': province_counts
+    }
+
+def top_counts(counts, limit=10):
+    """Get the largest counts, ties broken by key"""
+    return sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+
+def build_buyer_dashboard():
+    """Get the buyer dashboard overview and top-10 distributions from the counters"""
+    stats = get_dashboard_stats()
+    provinces = get_location_index().provinces
+
+    return {
+        'overview': {
+            'total_sellers': stats['sellers']['active'],
+            'total_crops': stats['crops']['available'],
+            'unique_crop_types': stats['crops']['unique_available'],
+            'verified_sellers': stats['sellers']['active_verified']
+        },
+        'crop_distribution': [
+            {'crop_name': crop_name, 'availability_count': count}
+            for crop_name, count in top_counts(stats['crop_counts'])
+        ],
+        'province_distribution': [
+            {'province': provinces[province_id]['name'] if province_id in provinces else None, 'seller_count': count}
+            for province_id, count in top_counts(stats['province_seller_counts'])
+        ]
+    }
+
+def _committed_value(state, name):
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:
+        return None
+    return state.attrs[name].value
+
+def _object_delta(obj, added, removed):
+    contribution, fields = CONTRIBUTIONS[type(obj)]
+    state = inspect(obj)
+    delta = Counter()
+    if added:
+        delta.update(contribution(*(getattr(obj, name) for name in fields)))
+    if removed:
+        delta.subtract(contribution(*(_committed_value(state, name) for name in fields)))
+    return delta
+
+def track_bulk_delta(session, delta):
+    """Count changes made with bulk writes, which skip the flush events, when the session commits"""
+    session.info.setdefault('dashboard_stats_delta', Counter()).update(delta)
+
+@event.listens_for(Session, 'after_flush')
+def _track_stats_changes(session, flush_context):
+    delta = session.info.setdefault('dashboard_stats_delta', Counter())
+    for obj in session.new:
+        if type(obj) in CONTRIBUTIONS:
+            delta.update(_object_delta(obj, True, False))
+    for obj in session.dirty:
+        if type(obj) in CONTRIBUTIONS and session.is_modified(obj, include_collections=False):
+            delta.update(_object_delta(obj, True, True))
+    for obj in session.deleted:
+        if type(obj) in CONTRIBUTIONS:
+            delta.update(_object_delta(obj, False, True))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_after_commit(session):
+    delta = session.info.pop('dashboard_stats_delta', None)
+    if delta:
+        apply_delta(delta)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dashboard_stats_delta', None)
@@ -1,5 +1,8 @@
 from app import db
-from app.models import Province, District, City
+from app.models import Province, District, City, Crop, Seller, SellerCrop, SellerCropDeletion
+from app.utils.crop_catalog import backfill_crop_ids, populate_crop_catalog
+from app.utils.location_cache import get_location_index
+from sqlalchemy import inspect, text
 
 # Sri Lankan location data
 SRI_LANKA_LOCATIONS = {
@@ -51,6 +54,7 @@ def init_database():
     try:
         # Create all tables
         db.create_all()
+        upgrade_schema()
         print("Database tables created successfully")
         
         # Populate location data if empty
@@ -59,11 +63,56 @@ def init_database():
             print("Location data populated successfully")
         else:
             print("Location data already exists")
+        
+        # Populate the crop catalog and link existing listings to it
+        if Crop.query.count() == 0:
+            populate_crop_catalog()
+            print("Crop catalog populated successfully")
+        linked = backfill_crop_ids()
+        if linked:
+            print(f"Linked {linked} seller crops to the crop catalog")
+        
+        # Load the location tree once so location reads never hit the database
+        get_location_index()
             
     except Exception as e:
         print(f"Database initialization error: {str(e)}")
         db.session.rollback()
 
+# Indexes replaced by composite indexes that start with the same columns
+RETIRED_INDEXES = {
+    'seller_crops': ['ix_seller_crops_crop_id']
+}
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created"""
+    inspector = inspect(db.engine)
+    columns = {column['name'] for column in inspector.get_columns('seller_crops')}
+    
+    if 'crop_id' not in columns:
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE seller_crops ADD COLUMN crop_id INTEGER NULL REFERENCES crops(id)'))
+        print("Added seller_crops.crop_id column")
+    
+    if 'version' not in columns:
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE seller_crops ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+        print("Added seller_crops.version column")
+    
+    # Create indexes declared on the models but missing from the tables, drop retired ones
+    for model in (Seller, SellerCrop, SellerCropDeletion):
+        table = model.__table__
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(db.engine)
+                print(f"Added index {index.name}")
+        for name in RETIRED_INDEXES.get(table.name, []):
+            if name in indexes:
+                with db.engine.begin() as connection:
+                    connection.execute(text(f'DROP INDEX {name} ON {table.name}' if db.engine.dialect.name == 'mysql' else f'DROP INDEX {name}'))
+                print(f"Dropped index {name}")
+
 def populate_location_data():
     """Populate provinces, districts, and cities"""
     try:
@@ -0,0 +1,48 @@
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from app.models import Province, District, City, Seller, SellerCrop
+
+# Full-table row counts, recomputed at most once per DIAGNOSTICS_TTL seconds
+_snapshot = None
+_lock = threading.Lock()
+
+def count_rows():
+    """Count the rows of every main table"""
+    return {
+        'total_provinces': Province.query.count(),
+        'total_districts': District.query.count(),
+        'total_cities': City.query.count(),
+        'total_sellers': Seller.query.count(),
+        'total_crops': SellerCrop.query.count()
+    }
+
+def get_row_counts():
+    """Get cached row counts, recounting when older than the TTL"""
+    global _snapshot
+
+    snapshot = _snapshot
+    ttl = current_app.config.get('DIAGNOSTICS_TTL', 30)
+    if snapshot is None or time.monotonic() - snapshot[0] > ttl:
+        # One thread recounts while the others keep serving the previous snapshot
+        if _lock.acquire(blocking=snapshot is None):
+            try:
+                # A thread that waited for the lock uses the counts just taken
+                snapshot = _snapshot
+                if snapshot is None or time.monotonic() - snapshot[0] > ttl:
+                    snapshot = (time.monotonic(), datetime.utcnow(), count_rows())
+                    _snapshot = snapshot
+            finally:
+                _lock.release()
+        else:
+            snapshot = _snapshot
+
+    return {
+        'counts': snapshot[2],
+        'counted_at': snapshot[1].isoformat(),
+        'age_seconds': round(time.monotonic() - snapshot[0], 1),
+        'ttl_seconds': ttl
+    }
@@ -0,0 +1,220 @@
+import warnings
+
+# numpy is imported inside the functions that use it, so importing the
+# routes at startup does not pay for it before the first recommendation
+
+# Request fields and the model feature each one feeds
+FEATURE_FIELDS = [
+    ('nitrogen_level', 'N_cat'),
+    ('phosphorous_level', 'P_cat'),
+    ('potassium_level', 'K_cat'),
+    ('temperature_level', 'temperature_cat'),
+    ('humidity_level', 'humidity_cat'),
+    ('ph_level', 'ph_cat'),
+    ('rainfall_level', 'rainfall_cat')
+]
+
+REQUIRED_FIELDS = [field for field, _ in FEATURE_FIELDS]
+FEATURE_COLUMNS = [col for _, col in FEATURE_FIELDS]
+
+# Raw sensor readings (training dataset column names) and the level field each one fills
+RAW_FIELDS = [
+    ('N', 'nitrogen_level'),
+    ('P', 'phosphorous_level'),
+    ('K', 'potassium_level'),
+    ('temperature', 'temperature_level'),
+    ('humidity', 'humidity_level'),
+    ('ph', 'ph_level'),
+    ('rainfall', 'rainfall_level')
+]
+
+def build_code_maps(encoders):
+    """Get label -> integer code dicts from the fitted LabelEncoders"""
+    return {
+        col: {label: code for code, label in enumerate(encoders[col].classes_)}
+        for col in FEATURE_COLUMNS
+    }
+
+def bin_readings(feature_bins, samples):
+    """Fill in level fields from raw numeric readings, binning each feature at once
+
+    Levels sent explicitly are kept. The thresholds are the ones stored in the
+    model package at training time. Returns the completed samples and a dict
+    of error messages for rows whose readings could not be binned.
+    """
+    import numpy as np
+
+    completed = [dict(sample) if isinstance(sample, dict) else sample for sample in samples]
+    invalid = {}
+    unbinned = {}
+
+    for feature, field in RAW_FIELDS:
+        rows = []
+        values = []
+        for row, sample in enumerate(completed):
+            if not isinstance(sample, dict) or sample.get(field) or sample.get(feature) in (None, ''):
+                continue
+            if feature_bins is None:
+                unbinned.setdefault(row, []).append(feature)
+                continue
+            try:
+                value = float(sample[feature])
+            except (TypeError, ValueError):
+                value = None
+            if value is None or isinstance(sample[feature], bool) or not np.isfinite(value):
+                invalid.setdefault(row, []).append(f"{feature}='{sample[feature]}' (expected a number)")
+                continue
+            rows.append(row)
+            values.append(value)
+
+        if rows:
+            spec = feature_bins[feature]
+            # right=True puts a value equal to a threshold in the lower level (<=)
+            indices = np.digitize(values, spec['thresholds'], right=True)
+            for row, index in zip(rows, indices):
+                completed[row][field] = spec['labels'][index]
+
+    errors = {row: f'Invalid readings: {"; ".join(messages)}' for row, messages in invalid.items()}
+    for row, features in unbinned.items():
+        errors[row] = f'Cannot bin raw readings ({", ".join(features)}): the model package has no feature bins, retrain it to accept raw readings'
+    return completed, errors
+
+def bin_sample(feature_bins, data):
+    """Fill in level fields of one request from raw numeric readings"""
+    completed, errors = bin_readings(feature_bins, [data])
+    if errors:
+        raise ValueError(errors[0])
+    return completed[0]
+
+def encode_sample(code_maps, data):
+    """Encode one request into a (1, n_features) array without pandas"""
+    import numpy as np
+
+    codes = []
+    for field, col in FEATURE_FIELDS:
+        value = data[field]
+        code = code_maps[col].get(value) if isinstance(value, str) else None
+        if code is None:
+            raise ValueError(f"y contains previously unseen labels: '{value}'")
+        codes.append(code)
+
+    return np.array([codes], dtype=np.int64)
+
+def encode_batch(code_maps, samples):
+    """Encode many samples column by column through the code maps
+
+    Returns the encoded matrix for the valid samples, their row numbers and
+    a dict of error messages for the rows that could not be encoded.
+    """
+    import numpy as np
+
+    n_samples = len(samples)
+    missing = [[] for _ in range(n_samples)]
+    invalid = [[] for _ in range(n_samples)]
+    columns = []
+
+    for field, col in FEATURE_FIELDS:
+        code_map = code_maps[col]
+        values = [sample.get(field) if isinstance(sample, dict) else None for sample in samples]
+        column = np.zeros(n_samples, dtype=np.int64)
+
+        for row, value in enumerate(values):
+            code = code_map.get(value) if isinstance(value, str) else None
+            if code is not None:
+                column[row] = code
+            elif not value:
+                missing[row].append(field)
+            else:
+                invalid[row].append(f"{field}='{value}' (expected one of: {', '.join(code_map)})")
+
+        columns.append(column)
+
+    errors = {}
+    for row in range(n_samples):
+        if missing[row]:
+            errors[row] = f'Missing required fields: {", ".join(missing[row])}'
+        elif invalid[row]:
+            errors[row] = f'Invalid input values: {"; ".join(invalid[row])}'
+
+    valid_rows = np.array([row for row in range(n_samples) if row not in errors], dtype=int)
+    codes = np.column_stack(columns)[valid_rows]
+
+    return codes, valid_rows, errors
+
+def score_batch(loaded_model, codes, top_k):
+    """Get the top-k crops and probabilities for a matrix of encoded samples
+
+    Everything is derived from a single probability matrix (or the
+    precomputed lookup table), so the model runs at most one forward pass.
+    """
+    import numpy as np
+
+    model = loaded_model.model
+    top_k = max(1, min(top_k, len(model.classes_)))
+
+    lookup_table = loaded_model.lookup_table
+    if lookup_table is not None and top_k <= lookup_table.top_classes.shape[1]:
+        return lookup_table.lookup_batch(codes, top_k)
+
+    # The model was fitted on a DataFrame; plain arrays hold the same encoded values
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        if not hasattr(model, 'predict_proba'):
+            return model.predict(codes)[:, np.newaxis], np.zeros((len(codes), 1))
+
+        probabilities = model.predict_proba(codes)
+    top_classes = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+
+    return model.classes_[top_classes], np.take_along_axis(probabilities, top_classes, axis=1)
+
+def format_predictions(crops, probabilities):
+    """Convert ranked crops and probabilities to dictionaries"""
+    return [
+        {
+            'crop': str(crop),
+            'confidence': float(probability),
+            'confidence_percentage': round(float(probability) * 100, 2)
+        }
+        for crop, probability in zip(crops, probabilities)
+    ]
+
+def score_sample(loaded_model, X_input, top_k=3):
+    """Get crop, confidence and ranked top-k predictions for one encoded sample"""
+    top_crops, top_probabilities = score_batch(loaded_model, X_input, top_k)
+    top_predictions = format_predictions(top_crops[0], top_probabilities[0])
+
+    return top_predictions[0]['crop'], top_predictions[0]['confidence'], top_predictions
+
+def recommend_batch(loaded_model, samples, top_k=3):
+    """Get per-row recommendations for a list of samples"""
+    samples, reading_errors = bin_readings(loaded_model.feature_bins, samples)
+    codes, valid_rows, errors = encode_batch(loaded_model.code_maps, samples)
+
+    # Rows with unusable readings also lack their levels, report the reading instead
+    errors.update(reading_errors)
+
+    results = [None] * len(samples)
+    for row, message in errors.items():
+        results[row] = {
+            'row': row,
+            'success': False,
+            'message': message
+        }
+
+    if len(valid_rows):
+        top_crops, top_probabilities = score_batch(loaded_model, codes, top_k)
+
+        for i, row in enumerate(valid_rows):
+            top_predictions = format_predictions(top_crops[i], top_probabilities[i])
+            results[row] = {
+                'row': int(row),
+                'success': True,
+                'recommendation': {
+                    'crop': top_predictions[0]['crop'],
+                    'confidence': top_predictions[0]['confidence'],
+                    'confidence_percentage': top_predictions[0]['confidence_percentage'],
+                    'top_predictions': top_predictions
+                }
+            }
+
+    return results
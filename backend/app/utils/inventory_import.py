@@ -0,0 +1,275 @@
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+from app import db
+from app.models import SellerCrop
+from app.utils.crop_availability import mark_inventory_changed
+from app.utils.crop_catalog import normalize_crop_name, resolve_crop_id
+from app.utils.dashboard_stats import crop_contribution, track_bulk_delta
+from app.utils.seller_dashboard import mark_seller_dashboard_changed
+
+# Rows sent to the database per executemany batch
+WRITE_BATCH_SIZE = 1000
+
+def parse_text(max_length):
+    def parse(value):
+        value = str(value).strip()
+        if len(value) > max_length:
+            raise ValueError(f'at most {max_length} characters')
+        return value or None
+    return parse
+
+def parse_amount(value):
+    if isinstance(value, bool):
+        raise ValueError('expected a number')
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('expected a number')
+    if not amount >= 0:
+        raise ValueError('expected a non-negative number')
+    return amount
+
+def parse_version(value):
+    if isinstance(value, bool):
+        raise ValueError('expected a whole number')
+    try:
+        version = int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError('expected a whole number')
+    if version < 1:
+        raise ValueError('expected a version of at least 1')
+    return version
+
+def parse_flag(value):
+    if isinstance(value, bool):
+        return value
+    flag = str(value).strip().lower()
+    if flag in ('true', '1', 'yes', 'y'):
+        return True
+    if flag in ('false', '0', 'no', 'n'):
+        return False
+    raise ValueError('expected true or false')
+
+# Listing fields a bulk import may set, with their parsers
+IMPORT_FIELDS = {
+    'crop_name': parse_text(100),
+    'crop_variety': parse_text(100),
+    'is_available': parse_flag,
+    'price_per_kg': parse_amount,
+    'price_per_unit': parse_amount,
+    'unit_type': parse_text(20),
+    'quantity_available': parse_amount,
+    'minimum_order': parse_amount,
+    'harvest_season': parse_text(100),
+    'best_quality_months': parse_text(100),
+    'quality_grade': parse_text(20),
+    'organic_certified': parse_flag,
+    'pesticide_free': parse_flag
+}
+
+# Values for fields a new listing's row leaves out, as in add_crop
+INSERT_DEFAULTS = {
+    'is_available': True,
+    'organic_certified': False,
+    'pesticide_free': False
+}
+
+# Optional column with the listing version a row's changes are based on
+VERSION_FIELD = 'version'
+
+def read_csv_rows(stream):
+    """Yield (row number, fields) from a CSV upload with a header line
+
+    Empty cells count as not provided.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    unknown = [column for column in reader.fieldnames or [] if column not in IMPORT_FIELDS and column != VERSION_FIELD]
+    if not reader.fieldnames or 'crop_name' not in reader.fieldnames:
+        raise ValueError('CSV header must include crop_name')
+    if unknown:
+        raise ValueError(f'Unknown columns: {", ".join(unknown)}')
+
+    for row_number, row in enumerate(reader, start=1):
+        if None in row:
+            yield row_number, ValueError('more cells than header columns')
+        else:
+            yield row_number, {field: value for field, value in row.items() if value not in (None, '')}
+
+def read_ndjson_rows(stream):
+    """Yield (row number, fields) from an upload with one JSON object per line"""
+    for row_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, ValueError('invalid JSON')
+            continue
+        if not isinstance(row, dict):
+            yield row_number, ValueError('expected a JSON object')
+        else:
+            yield row_number, row
+
+def validate_row(row):
+    """Get the parsed fields of one row, the version it is based on (or None) and a list of problems"""
+    values = {}
+    version = None
+    problems = []
+    for field, value in row.items():
+        parser = IMPORT_FIELDS.get(field)
+        if field == VERSION_FIELD:
+            try:
+                version = parse_version(value)
+            except ValueError as e:
+                problems.append(f'{field}={value!r}: {e}')
+        elif parser is None:
+            problems.append(f'{field}: unknown field')
+        elif value is None:
+            # Flags and the name have no empty value; other fields are cleared
+            if field == 'crop_name' or field in INSERT_DEFAULTS:
+                problems.append(f'{field}: cannot be null')
+            else:
+                values[field] = None
+        else:
+            try:
+                values[field] = parser(value)
+            except (TypeError, ValueError) as e:
+                problems.append(f'{field}={value!r}: {e}')
+
+    if not problems and not values.get('crop_name'):
+        problems.append('crop_name: required')
+    return values, version, problems
+
+def listing_key(crop_name, crop_variety):
+    """Rows and listings with the same key are the same SKU"""
+    return normalize_crop_name(crop_name), (crop_variety or '').strip().lower()
+
+def import_inventory(seller_id, rows, max_rows):
+    """Validate every row, then insert or update the seller's listings in one transaction
+
+    A row updates the seller's listing with the same crop name and variety,
+    or adds a new listing. Only the fields a row provides are written. A row
+    with a version is applied only if the listing is still at that version.
+    Rows with problems or version conflicts are reported and skipped.
+    Returns the per-row report.
+    """
+    results = []
+    valid = {}
+    seen = {}
+    for row_number, row in rows:
+        if len(results) >= max_rows:
+            raise ValueError(f'Too many rows, at most {max_rows} per import')
+
+        if isinstance(row, Exception):
+            results.append({'row': row_number, 'success': False, 'message': str(row)})
+            continue
+
+        values, version, problems = validate_row(row)
+        if not problems:
+            key = listing_key(values['crop_name'], values.get('crop_variety'))
+            if key in seen:
+                problems.append(f'duplicate of row {seen[key]}')
+            else:
+                seen[key] = row_number
+
+        if problems:
+            results.append({'row': row_number, 'success': False, 'message': '; '.join(problems)})
+        else:
+            results.append({'row': row_number, 'success': True})
+            valid[row_number] = (key, values, version)
+
+    # One query for the seller's current listings, with the values the statistics count,
+    # locked so a PATCH or PUT cannot change them before the import commits
+    existing = {}
+    listings = db.session.query(
+        SellerCrop.id, SellerCrop.crop_name, SellerCrop.crop_variety, SellerCrop.version,
+        SellerCrop.is_available, SellerCrop.organic_certified
+    ).filter(SellerCrop.seller_id == seller_id).order_by(SellerCrop.created_at, SellerCrop.id).with_for_update()
+    for listing in listings:
+        existing.setdefault(listing_key(listing.crop_name, listing.crop_variety), listing)
+
+    now = datetime.utcnow()
+    inserts = []
+    updates = []
+    delta = Counter()
+    for result in results:
+        if not result['success']:
+            continue
+        key, values, version = valid[result['row']]
+        listing = existing.get(key)
+
+        if version is not None and listing is None:
+            result.update(success=False, message='version given, but the seller has no listing to update')
+            continue
+        if version is not None and version != listing.version:
+            result.update(success=False, message='Version conflict', current_version=listing.version)
+            continue
+
+        values['crop_id'] = resolve_crop_id(values['crop_name'])
+
+        if listing is None:
+            mapping = dict(INSERT_DEFAULTS, id=str(uuid.uuid4()), seller_id=seller_id, created_at=now, updated_at=now)
+            mapping.update(values)
+            inserts.append(mapping)
+            delta.update(crop_contribution(mapping['is_available'], mapping['organic_certified'], mapping['crop_name']))
+            result.update(action='inserted', id=mapping['id'])
+        else:
+            mapping = dict(values, b_id=listing.id, b_version=listing.version, updated_at=now)
+            updates.append(mapping)
+            delta.subtract(crop_contribution(listing.is_available, listing.organic_certified, listing.crop_name))
+            delta.update(crop_contribution(
+                mapping.get('is_available', listing.is_available),
+                mapping.get('organic_certified', listing.organic_certified),
+                mapping.get('crop_name', listing.crop_name)
+            ))
+            result.update(action='updated', id=listing.id, version=listing.version + 1)
+
+    for start in range(0, len(inserts), WRITE_BATCH_SIZE):
+        db.session.bulk_insert_mappings(SellerCrop, inserts[start:start + WRITE_BATCH_SIZE])
+
+    # Each update applies only to the version that was read, as in apply_inventory_patch
+    groups = {}
+    for mapping in updates:
+        fields = tuple(sorted(field for field in mapping if field not in ('b_id', 'b_version', 'updated_at')))
+        groups.setdefault(fields, []).append(mapping)
+
+    table = SellerCrop.__table__
+    applied = 0
+    for fields, mappings in groups.items():
+        statement = table.update().where(
+            table.c.id == bindparam('b_id'),
+            table.c.version == bindparam('b_version')
+        ).values(
+            version=table.c.version + 1,
+            updated_at=bindparam('updated_at'),
+            **{field: bindparam(field) for field in fields}
+        )
+        for start in range(0, len(mappings), WRITE_BATCH_SIZE):
+            applied += db.session.execute(statement, mappings[start:start + WRITE_BATCH_SIZE]).rowcount
+
+    if applied != len(updates):
+        # Only possible without row locks (SQLite); let the client retry the import
+        db.session.rollback()
+        raise RuntimeError('A listing changed during the import, retry the upload')
+
+    # Bulk writes skip the flush events that keep the in-process caches current
+    if inserts or updates:
+        track_bulk_delta(db.session, delta)
+        mark_inventory_changed(db.session)
+        mark_seller_dashboard_changed(db.session, seller_id)
+    db.session.commit()
+
+    return {
+        'total_rows': len(results),
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'failed': len(results) - len(inserts) - len(updates),
+        'results': results
+    }
@@ -0,0 +1,233 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, event, or_
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import SellerCrop, SellerCropDeletion
+from app.utils.crop_availability import mark_inventory_changed
+from app.utils.dashboard_stats import crop_contribution, track_bulk_delta
+from app.utils.inventory_import import parse_amount, parse_flag
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.seller_dashboard import mark_seller_dashboard_changed
+
+# Listing columns sent by the change feed; cultivation details are left out
+SYNC_COLUMNS = [
+    SellerCrop.id, SellerCrop.crop_name, SellerCrop.crop_id, SellerCrop.crop_variety,
+    SellerCrop.is_available, SellerCrop.price_per_kg, SellerCrop.price_per_unit, SellerCrop.unit_type,
+    SellerCrop.quantity_available, SellerCrop.minimum_order, SellerCrop.quality_grade,
+    SellerCrop.organic_certified, SellerCrop.pesticide_free, SellerCrop.version, SellerCrop.updated_at
+]
+
+# Fields a PATCH may change, with their parsers
+PATCH_FIELDS = {
+    'is_available': parse_flag,
+    'price_per_kg': parse_amount,
+    'price_per_unit': parse_amount,
+    'quantity_available': parse_amount,
+    'minimum_order': parse_amount
+}
+
+def encode_sync_token(updated_at, crop_id, deleted_at, deletion_id):
+    """Get an opaque token for a position in the change feed"""
+    return encode_cursor([
+        updated_at.isoformat() if updated_at else None, crop_id,
+        deleted_at.isoformat() if deleted_at else None, deletion_id
+    ])
+
+def decode_sync_token(token):
+    """Get (updated_at, crop id, deleted_at, deletion id) back from a token, None and 0 for a full sync"""
+    if not token:
+        return None, None, None, 0
+    updated_at, crop_id, deleted_at, deletion_id = decode_cursor(token, 4)
+    try:
+        updated_at = datetime.fromisoformat(updated_at) if updated_at else None
+        deleted_at = datetime.fromisoformat(deleted_at) if deleted_at else None
+        deletion_id = int(deletion_id)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid sync token')
+    return updated_at, crop_id, deleted_at, deletion_id
+
+def get_changes(seller_id, token=None, limit=500, lag_seconds=0):
+    """Get a seller's listings changed and deleted after the token
+
+    Changes come in (updated_at, id) order through the seller/updated_at
+    index, so each page is one range scan. A listing changed twice between
+    polls is sent once, with its latest values.
+
+    updated_at and deletion ids are assigned before the writing transaction
+    commits, so a write can become visible behind a position already
+    returned. Each poll therefore also re-sends the changes and deletions
+    from the lag_seconds before the token; clients may see a listing again
+    and keep the copy with the highest version.
+    """
+    updated_at, crop_id, deleted_at, deletion_id = decode_sync_token(token)
+    lag = timedelta(seconds=lag_seconds)
+
+    query = db.session.query(*SYNC_COLUMNS).filter(SellerCrop.seller_id == seller_id)
+    recent = []
+    if updated_at is not None:
+        recent = query.filter(
+            SellerCrop.updated_at > updated_at - lag,
+            or_(
+                SellerCrop.updated_at < updated_at,
+                and_(SellerCrop.updated_at == updated_at, SellerCrop.id <= crop_id)
+            )
+        ).order_by(SellerCrop.updated_at, SellerCrop.id).all()
+        query = query.filter(or_(
+            SellerCrop.updated_at > updated_at,
+            and_(SellerCrop.updated_at == updated_at, SellerCrop.id > crop_id)
+        ))
+    rows = query.order_by(SellerCrop.updated_at, SellerCrop.id).limit(limit + 1).all()
+
+    deletions = SellerCropDeletion.query.filter(SellerCropDeletion.seller_id == seller_id)
+    recent_deletions = []
+    if deleted_at is not None:
+        recent_deletions = deletions.filter(
+            SellerCropDeletion.id <= deletion_id,
+            SellerCropDeletion.deleted_at > deleted_at - lag
+        ).order_by(SellerCropDeletion.id).all()
+    deletions = deletions.filter(SellerCropDeletion.id > deletion_id).order_by(SellerCropDeletion.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit or len(deletions) > limit
+    rows = rows[:limit]
+    deletions = deletions[:limit]
+
+    if rows:
+        updated_at, crop_id = rows[-1].updated_at, rows[-1].id
+    if deletions:
+        deleted_at, deletion_id = deletions[-1].deleted_at, deletions[-1].id
+
+    changes = []
+    for row in recent + rows:
+        change = row._asdict()
+        change['updated_at'] = row.updated_at.isoformat() if row.updated_at else None
+        changes.append(change)
+
+    return {
+        'changes': changes,
+        'deleted': [deletion.seller_crop_id for deletion in recent_deletions + deletions],
+        'has_more': has_more,
+        'next_token': encode_sync_token(updated_at, crop_id, deleted_at, deletion_id)
+    }
+
+def validate_patch(item):
+    """Get the id, expected version and parsed fields of one PATCH item, or raise ValueError"""
+    if not isinstance(item, dict) or not item.get('id'):
+        raise ValueError('each update needs an id')
+    version = item.get('version')
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError('version: expected the integer version the change is based on')
+
+    values = {}
+    problems = []
+    for field, value in item.items():
+        if field in ('id', 'version'):
+            continue
+        parser = PATCH_FIELDS.get(field)
+        if parser is None:
+            problems.append(f'{field}: cannot be patched')
+            continue
+        try:
+            values[field] = parser(value)
+        except (TypeError, ValueError) as e:
+            problems.append(f'{field}={value!r}: {e}')
+
+    if not values and not problems:
+        problems.append(f'nothing to update, send any of {", ".join(PATCH_FIELDS)}')
+    if problems:
+        raise ValueError('; '.join(problems))
+    return item['id'], version, values
+
+def apply_inventory_patch(seller_id, items):
+    """Apply price, quantity and availability updates to a seller's listings
+
+    Each update names the version it is based on and is applied only if the
+    listing is still at that version; otherwise it is reported as a conflict
+    with the current version. Updates with the same fields are sent as one
+    executemany, all in one transaction.
+    """
+    results = []
+    patches = {}
+    for item in items:
+        try:
+            crop_id, version, values = validate_patch(item)
+        except ValueError as e:
+            results.append({'id': item.get('id') if isinstance(item, dict) else None, 'success': False, 'message': str(e)})
+            continue
+        if crop_id in patches:
+            results.append({'id': crop_id, 'success': False, 'message': 'duplicate update for this crop'})
+            continue
+        patches[crop_id] = (version, values)
+        results.append({'id': crop_id, 'success': True})
+
+    # Lock the listings so the versions cannot change before the update
+    current = {
+        row.id: row for row in db.session.query(
+            SellerCrop.id, SellerCrop.version, SellerCrop.crop_name,
+            SellerCrop.is_available, SellerCrop.organic_certified
+        ).filter(
+            SellerCrop.seller_id == seller_id,
+            SellerCrop.id.in_(list(patches))
+        ).with_for_update()
+    } if patches else {}
+
+    now = datetime.utcnow()
+    groups = {}
+    delta = Counter()
+    for result in results:
+        if not result['success']:
+            continue
+        version, values = patches[result['id']]
+        row = current.get(result['id'])
+        if row is None:
+            result.update(success=False, message='Crop not found')
+        elif row.version != version:
+            result.update(success=False, message='Version conflict', current_version=row.version)
+        else:
+            params = dict(values, b_id=row.id, b_version=version, updated_at=now)
+            groups.setdefault(tuple(sorted(values)), []).append(params)
+            result['version'] = version + 1
+            if 'is_available' in values:
+                delta.subtract(crop_contribution(row.is_available, row.organic_certified, row.crop_name))
+                delta.update(crop_contribution(values['is_available'], row.organic_certified, row.crop_name))
+
+    table = SellerCrop.__table__
+    applied = 0
+    for fields, params in groups.items():
+        statement = table.update().where(
+            table.c.id == bindparam('b_id'),
+            table.c.version == bindparam('b_version')
+        ).values(
+            version=table.c.version + 1,
+            updated_at=bindparam('updated_at'),
+            **{field: bindparam(field) for field in fields}
+        )
+        applied += db.session.execute(statement, params).rowcount
+
+    if applied != sum(len(params) for params in groups.values()):
+        # Only possible without row locks (SQLite); let the client retry the batch
+        db.session.rollback()
+        raise RuntimeError('A listing changed during the update, retry the batch')
+
+    # Core updates skip the flush events that keep the in-process caches current
+    if groups:
+        track_bulk_delta(db.session, delta)
+        mark_inventory_changed(db.session)
+        mark_seller_dashboard_changed(db.session, seller_id)
+    db.session.commit()
+
+    return {
+        'applied': applied,
+        'failed': len(results) - applied,
+        'results': results
+    }
+
+@event.listens_for(Session, 'before_flush')
+def _track_listing_deletions(session, flush_context, instances):
+    # Deleted listings leave a row for the change feed to report;
+    # versions of updated listings are bumped by the mapper (version_id_col)
+    for obj in session.deleted:
+        if isinstance(obj, SellerCrop):
+            session.add(SellerCropDeletion(seller_crop_id=obj.id, seller_id=obj.seller_id))
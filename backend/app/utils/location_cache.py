@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Province, District, City
+
+_index = None
+_generation = 0
+_lock = threading.Lock()
+
+class LocationIndex:
+    """Snapshot of the province/district/city tree
+
+    A snapshot is never modified after it is built; writes to the location
+    tables replace it with a new one.
+    """
+
+    def __init__(self, provinces, districts, cities):
+        by_name = lambda item: item['name']
+
+        self.provinces = {province['id']: province for province in provinces}
+        self.districts = {district['id']: district for district in districts}
+        self.cities = {city['id']: city for city in cities}
+
+        self.province_list = sorted(provinces, key=by_name)
+        self.districts_by_province = {province_id: [] for province_id in self.provinces}
+        for district in sorted(districts, key=by_name):
+            self.districts_by_province.setdefault(district['province_id'], []).append(district)
+        self.cities_by_district = {district_id: [] for district_id in self.districts}
+        for city in sorted(cities, key=by_name):
+            self.cities_by_district.setdefault(city['district_id'], []).append(city)
+
+        # Changes whenever any location changes, used as the ETag of every location response
+        content = json.dumps([self.province_list, sorted(districts, key=lambda d: d['id']), sorted(cities, key=lambda c: c['id'])], sort_keys=True)
+        self.version = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+    def location_info(self, city_id):
+        """Get city, district and province for a city, or None if it does not exist"""
+        city = self.cities.get(city_id)
+        if city is None:
+            return None
+        district = self.districts[city['district_id']]
+        return {
+            'city': city,
+            'district': district,
+            'province': self.provinces[district['province_id']]
+        }
+
+    def validate_hierarchy(self, province_id, district_id, city_id):
+        """Get an error message if the ids do not exist or do not nest, else None"""
+        try:
+            province_id, district_id, city_id = int(province_id), int(district_id), int(city_id)
+        except (TypeError, ValueError):
+            return 'Invalid location IDs provided'
+
+        province = self.provinces.get(province_id)
+        district = self.districts.get(district_id)
+        city = self.cities.get(city_id)
+
+        if not province or not district or not city:
+            return 'Invalid location IDs provided'
+        if district['province_id'] != province['id'] or city['district_id'] != district['id']:
+            return 'Location hierarchy mismatch'
+        return None
+
+def build_location_index():
+    """Load the whole location tree in three queries"""
+    return LocationIndex(
+        [province.to_dict() for province in Province.query.all()],
+        [district.to_dict() for district in District.query.all()],
+        [city.to_dict() for city in City.query.all()]
+    )
+
+def invalidate_location_index():
+    """Drop the location index so the next read rebuilds it"""
+    global _index, _generation
+    with _lock:
+        _index = None
+        _generation += 1
+
+def get_location_index():
+    """Get the shared location index, building it on first use"""
+    global _index
+
+    index = _index
+    if index is None:
+        generation = _generation
+        index = build_location_index()
+        with _lock:
+            # Keep the result only if no write was committed while building it
+            if generation == _generation:
+                _index = index
+
+    return index
+
+@event.listens_for(Session, 'after_flush')
+def _track_location_changes(session, flush_context):
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, (Province, District, City)) for obj in changed):
+        session.info['locations_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('locations_changed', False):
+        invalidate_location_index()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('locations_changed', None)
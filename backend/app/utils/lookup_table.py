@@ -0,0 +1,56 @@
+import os
+
+# The training script loads this module by path, without the Flask app package,
+# so it imports only the standard library at module level
+
+def lookup_table_path(model_path):
+    """Get the lookup table path that belongs to a model pickle"""
+    return os.path.splitext(model_path)[0] + '_lookup.npz'
+
+class LookupTable:
+    """Precomputed recommendations for every encoded categorical input"""
+
+    def __init__(self, path, arrays):
+        self.path = path
+        self.model_checksum = str(arrays['model_checksum'])
+        self.feature_columns = [str(col) for col in arrays['feature_columns']]
+        self.dims = tuple(int(dim) for dim in arrays['dims'])
+        self.classes = arrays['classes']
+        self.predicted = arrays['predicted']
+        self.top_classes = arrays['top_classes']
+        self.top_probabilities = arrays['top_probabilities']
+
+    def __len__(self):
+        return len(self.predicted)
+
+    def lookup_batch(self, codes, top_k):
+        """Get the top-k classes and probabilities for a matrix of encoded samples"""
+        import numpy as np
+
+        rows = np.ravel_multi_index(tuple(np.asarray(codes).T), self.dims)
+        return self.classes[self.top_classes[rows, :top_k]], self.top_probabilities[rows, :top_k]
+
+    def to_dict(self):
+        """Convert lookup table metadata to dictionary"""
+        return {
+            'path': self.path,
+            'entries': len(self),
+            'top_k': self.top_classes.shape[1],
+            'model_checksum': self.model_checksum
+        }
+
+def load_lookup_table(path, model_checksum):
+    """Load a lookup table, ignoring it if it was built from another model"""
+    if not os.path.exists(path):
+        return None
+
+    import numpy as np
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+
+    table = LookupTable(path, arrays)
+    if table.model_checksum != model_checksum:
+        print(f"WARNING: Ignoring stale lookup table {path}, rebuild it with 'python crop_recommendation_model.py --build-lookup'")
+        return None
+
+    return table
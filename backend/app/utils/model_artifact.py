@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import shutil
+
+# The training script loads this module by path, without the Flask app package,
+# so it imports only the standard library at module level
+
+# Model artifact layout, a directory next to the pickle it was exported from:
+#
+#   manifest.json    format version, model version, hashes and model parameters
+#   encoders.json    label vocabulary of every categorical feature
+#   *.npy            weight matrices and lookup table arrays, memory-mapped read-only
+#
+# Mapped arrays are backed by the page cache, so every worker on a host shares
+# one physical copy and loading only reads the JSON files.
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+ENCODERS_FILE = 'encoders.json'
+
+def file_checksum(path):
+    """Get SHA-256 checksum of a file"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def artifact_path(model_path):
+    """Get the artifact directory that belongs to a model pickle"""
+    return os.path.splitext(model_path)[0] + '_artifact'
+
+def content_checksum(files):
+    """Get one checksum over the checksums of every artifact file"""
+    content = json.dumps({name: info['sha256'] for name, info in files.items()}, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def _expit(x):
+    import numpy as np
+    return np.exp(-np.logaddexp(0, -x))
+
+def _softmax(x):
+    import numpy as np
+    exp = np.exp(x - x.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def _relu(x):
+    import numpy as np
+    return np.maximum(x, 0)
+
+def _tanh(x):
+    import numpy as np
+    return np.tanh(x)
+
+HIDDEN_ACTIVATIONS = {
+    'identity': lambda x: x,
+    'logistic': _expit,
+    'tanh': _tanh,
+    'relu': _relu
+}
+
+class Vocabulary:
+    """Label vocabulary of one categorical feature, in place of a fitted LabelEncoder"""
+
+    def __init__(self, labels):
+        import numpy as np
+        self.classes_ = np.asarray(labels)
+        self.codes = {label: code for code, label in enumerate(labels)}
+
+    def transform(self, values):
+        """Get the integer code of every label"""
+        import numpy as np
+        unseen = [value for value in values if value not in self.codes]
+        if unseen:
+            raise ValueError(f'y contains previously unseen labels: {unseen}')
+        return np.array([self.codes[value] for value in values], dtype=np.int64)
+
+class MappedMLP:
+    """MLPClassifier forward pass over memory-mapped weights"""
+
+    def __init__(self, classes, coefs, intercepts, activation, out_activation):
+        import numpy as np
+        self.classes_ = np.asarray(classes)
+        self.coefs = coefs
+        self.intercepts = intercepts
+        self.activation = activation
+        self.out_activation = out_activation
+
+    def predict_proba(self, X):
+        """Get class probabilities, matching MLPClassifier.predict_proba"""
+        import numpy as np
+        activation = np.asarray(X, dtype=self.coefs[0].dtype)
+        last_layer = len(self.coefs) - 1
+        for layer, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef + intercept
+            if layer != last_layer:
+                activation = HIDDEN_ACTIVATIONS[self.activation](activation)
+
+        if self.out_activation == 'softmax':
+            return _softmax(activation)
+        # Binary models have a single logistic output
+        probability = _expit(activation).ravel()
+        return np.column_stack([1 - probability, probability])
+
+    def predict(self, X):
+        """Get the most probable class of every sample"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+class MappedLogisticRegression:
+    """LogisticRegression scoring over memory-mapped weights"""
+
+    def __init__(self, classes, coef, intercept, multinomial):
+        import numpy as np
+        self.classes_ = np.asarray(classes)
+        self.coef = coef
+        self.intercept = intercept
+        self.multinomial = multinomial
+
+    def predict_proba(self, X):
+        """Get class probabilities, matching LogisticRegression.predict_proba"""
+        import numpy as np
+        decision = np.asarray(X, dtype=self.coef.dtype) @ self.coef.T + self.intercept
+
+        if decision.shape[1] == 1:
+            decision = decision.ravel()
+            if self.multinomial:
+                return _softmax(np.column_stack([-decision, decision]))
+            probability = _expit(decision)
+            return np.column_stack([1 - probability, probability])
+
+        if self.multinomial:
+            return _softmax(decision)
+        # One-vs-rest: independent sigmoids normalised to sum to one
+        probabilities = _expit(decision)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        """Get the most probable class of every sample"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+def model_weights(model):
+    """Get the parameters and weight arrays of a fitted model
+
+    Only models whose prediction is a few matrix products can be exported.
+    """
+    import numpy as np
+    model_class = type(model).__name__
+
+    if model_class == 'MLPClassifier':
+        arrays = {}
+        for layer, (coef, intercept) in enumerate(zip(model.coefs_, model.intercepts_)):
+            arrays[f'coef_{layer}'] = coef
+            arrays[f'intercept_{layer}'] = intercept
+        params = {
+            'kind': 'mlp',
+            'layers': len(model.coefs_),
+            'activation': model.activation,
+            'out_activation': model.out_activation_
+        }
+        return params, arrays
+
+    if model_class == 'LogisticRegression':
+        arrays = {'coef': np.asarray(model.coef_), 'intercept': np.asarray(model.intercept_)}
+        # Whether predict_proba uses softmax or one-vs-rest depends on the installed
+        # scikit-learn, so take the form that reproduces the fitted model's output
+        for multinomial in (True, False):
+            params = {'kind': 'logistic_regression', 'multinomial': multinomial}
+            if matches_model(model, mapped_model(params, arrays, model.classes_)):
+                return params, arrays
+        raise ValueError('LogisticRegression probabilities match neither softmax nor one-vs-rest, not exporting')
+
+    raise ValueError(f'{model_class} has no weight matrix artifact format, only MLPClassifier and LogisticRegression do')
+
+def mapped_model(params, arrays, classes):
+    """Build the numpy scorer for exported model parameters and weight arrays"""
+    if params['kind'] == 'mlp':
+        return MappedMLP(
+            classes,
+            [arrays[f'coef_{layer}'] for layer in range(params['layers'])],
+            [arrays[f'intercept_{layer}'] for layer in range(params['layers'])],
+            params['activation'],
+            params['out_activation']
+        )
+    if params['kind'] == 'logistic_regression':
+        return MappedLogisticRegression(classes, arrays['coef'], arrays['intercept'], params['multinomial'])
+    raise ValueError(f"Unknown model kind {params['kind']}")
+
+def matches_model(model, mapped, rows=256):
+    """Check that a mapped scorer gives the fitted model's probabilities on a probe batch"""
+    import numpy as np
+    # Small non-negative integers, like the encoded categorical features
+    probe = np.random.default_rng(0).integers(0, 8, size=(rows, model.n_features_in_)).astype(np.float64)
+    return np.allclose(mapped.predict_proba(probe), model.predict_proba(probe), rtol=1e-6, atol=1e-9)
+
+def export_artifact(model_package, directory, source_checksum=None, lookup_arrays=None):
+    """Write a model package as a memory-mappable artifact directory
+
+    The directory is written next to its final location and moved into place,
+    so a running server never sees a half-written artifact.
+    """
+    import numpy as np
+    model = model_package['model']
+    params, arrays = model_weights(model)
+    if not matches_model(model, mapped_model(params, arrays, model.classes_)):
+        raise ValueError(f'Exported {type(model).__name__} weights do not reproduce predict_proba, not exporting')
+
+    lookup = None
+    if lookup_arrays is not None:
+        lookup = {'model_checksum': str(lookup_arrays['model_checksum'])}
+        for name, array in lookup_arrays.items():
+            if name != 'model_checksum':
+                arrays[f'lookup_{name}'] = array
+
+    staging = directory + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    encoders = {col: [str(label) for label in encoder.classes_] for col, encoder in model_package['encoders'].items()}
+    with open(os.path.join(staging, ENCODERS_FILE), 'w') as f:
+        json.dump(encoders, f, indent=2)
+
+    files = {ENCODERS_FILE: {'sha256': file_checksum(os.path.join(staging, ENCODERS_FILE))}}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        file_name = f'{name}.npy'
+        np.save(os.path.join(staging, file_name), array, allow_pickle=False)
+        files[file_name] = {
+            'sha256': file_checksum(os.path.join(staging, file_name)),
+            'shape': list(array.shape),
+            'dtype': array.dtype.str
+        }
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_class': type(model).__name__,
+        'model_type': model_package.get('model_type'),
+        'model_version': model_package.get('model_version'),
+        'source_sha256': source_checksum,
+        'sha256': content_checksum(files),
+        'classes': [str(label) for label in model.classes_],
+        'feature_bins': model_package.get('feature_bins'),
+        'model': params,
+        'lookup': lookup,
+        'files': files
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.isdir(directory):
+        previous = directory + '.old'
+        shutil.rmtree(previous, ignore_errors=True)
+        os.rename(directory, previous)
+        os.rename(staging, directory)
+        shutil.rmtree(previous)
+    else:
+        os.rename(staging, directory)
+
+    return manifest
+
+def read_manifest(directory):
+    """Read the manifest of an artifact directory"""
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format {manifest.get('format_version')} in {directory}")
+    return manifest
+
+def verify_artifact(directory):
+    """Get a list of files whose contents do not match the manifest"""
+    manifest = read_manifest(directory)
+    problems = []
+    for name, info in manifest['files'].items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            problems.append(f'{name}: missing')
+        elif file_checksum(path) != info['sha256']:
+            problems.append(f'{name}: checksum mismatch')
+    if content_checksum(manifest['files']) != manifest['sha256']:
+        problems.append(f'{MANIFEST_FILE}: content checksum mismatch')
+    return problems
+
+def load_artifact(directory):
+    """Load an artifact with every array memory-mapped read-only
+
+    Returns a model package dict shaped like the pickled one, the lookup
+    table (or None) and the manifest.
+    """
+    import numpy as np
+    manifest = read_manifest(directory)
+
+    with open(os.path.join(directory, ENCODERS_FILE)) as f:
+        encoders = {col: Vocabulary(labels) for col, labels in json.load(f).items()}
+
+    arrays = {}
+    for name, info in manifest['files'].items():
+        if name.endswith('.npy'):
+            array = np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+            if list(array.shape) != info['shape'] or array.dtype.str != info['dtype']:
+                raise ValueError(f'{name} in {directory} does not match its manifest entry')
+            arrays[name[:-len('.npy')]] = array
+
+    try:
+        model = mapped_model(manifest['model'], arrays, manifest['classes'])
+    except ValueError as e:
+        raise ValueError(f'{e} in {directory}')
+
+    lookup_table = None
+    if manifest.get('lookup'):
+        from app.utils.lookup_table import LookupTable
+        lookup = {name[len('lookup_'):]: array for name, array in arrays.items() if name.startswith('lookup_')}
+        lookup['model_checksum'] = manifest['lookup']['model_checksum']
+        lookup_table = LookupTable(directory, lookup)
+
+    model_package = {
+        'model': model,
+        'encoders': encoders,
+        'model_type': manifest.get('model_type'),
+        'model_version': manifest.get('model_version'),
+        'feature_bins': manifest.get('feature_bins'),
+        'model_class': manifest['model_class']
+    }
+    return model_package, lookup_table, manifest
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from app.utils.inference import build_code_maps
+from app.utils.lookup_table import load_lookup_table, lookup_table_path
+from app.utils.model_artifact import artifact_path, file_checksum, load_artifact, read_manifest, verify_artifact
+
+# Default location of the trained model package
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'routes', 'crop_recommendation_model.pkl')
+
+_models = {}
+_lock = threading.Lock()
+
+class LoadedModel:
+    """Crop recommendation model package loaded once per worker process"""
+
+    def __init__(self, path, model_package, checksum, load_time, lookup_table=None):
+        self.path = path
+        self.model = model_package['model']
+        self.encoders = model_package['encoders']
+        self.code_maps = build_code_maps(self.encoders)
+        self.model_type = model_package.get('model_type')
+        self.model_class = model_package.get('model_class') or self.model.__class__.__name__
+        # 'artifact' when the weights are memory-mapped from an artifact directory
+        self.format = model_package.get('format', 'pickle')
+        # Thresholds for binning raw readings, absent from older pickles
+        self.feature_bins = model_package.get('feature_bins')
+        self.checksum = checksum
+        # Older pickles carry no version, fall back to the checksum prefix
+        self.version = model_package.get('model_version') or checksum[:12]
+        self.load_time = load_time
+        self.loaded_at = datetime.utcnow()
+        self.lookup_table = lookup_table
+
+    def to_dict(self):
+        """Convert model metadata to dictionary"""
+        return {
+            'path': self.path,
+            'model_type': self.model_type,
+            'model_class': self.model_class,
+            'format': self.format,
+            'version': self.version,
+            'checksum': self.checksum,
+            'load_time_ms': round(self.load_time * 1000, 2),
+            'loaded_at': self.loaded_at.isoformat(),
+            'accepts_raw_readings': self.feature_bins is not None,
+            'lookup_table': self.lookup_table.to_dict() if self.lookup_table else None
+        }
+
+# Settings that let one route serve its own pickle instead of MODEL_PATH
+MODEL_PATH_OVERRIDES = ('BUYER_MODEL_PATH', 'TEST_MODEL_PATH')
+
+def get_model_path(config_key=None):
+    """Get the configured model path, falling back to the default location
+
+    config_key names a per-route override from MODEL_PATH_OVERRIDES; when it
+    is unset the route uses MODEL_PATH.
+    """
+    try:
+        from flask import current_app
+        config = current_app.config
+        return (config_key and config.get(config_key)) or config.get('MODEL_PATH') or DEFAULT_MODEL_PATH
+    except RuntimeError:
+        # Outside of an application context
+        return DEFAULT_MODEL_PATH
+
+def configured_model_paths():
+    """Get every distinct model path the routes are configured to serve"""
+    paths = [os.path.abspath(get_model_path(key)) for key in (None,) + MODEL_PATH_OVERRIDES]
+    return list(dict.fromkeys(paths))
+
+def load_artifact_model(directory):
+    """Load a model artifact directory with its weights memory-mapped
+
+    Raises ValueError if a file does not match the checksums in the manifest.
+    """
+    start = time.perf_counter()
+    problems = verify_artifact(directory)
+    if problems:
+        raise ValueError(f'Model artifact {directory} failed verification: {"; ".join(problems)}')
+    model_package, lookup_table, manifest = load_artifact(directory)
+    load_time = time.perf_counter() - start
+
+    model_package['format'] = 'artifact'
+    # An artifact exported from a pickle keeps the pickle's checksum and version
+    checksum = manifest.get('source_sha256') or manifest['sha256']
+
+    return LoadedModel(directory, model_package, checksum, load_time, lookup_table)
+
+def load_model(model_path):
+    """Load a model package from disk
+
+    Accepts a pickle or an artifact directory. For a pickle, the artifact
+    exported from it is used instead when one exists.
+    """
+    if os.path.isdir(model_path):
+        return load_artifact_model(model_path)
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f'ML model not found at: {model_path}')
+
+    checksum = file_checksum(model_path)
+
+    directory = artifact_path(model_path)
+    if os.path.isdir(directory):
+        try:
+            if read_manifest(directory).get('source_sha256') == checksum:
+                return load_artifact_model(directory)
+            print(f"WARNING: Ignoring stale model artifact {directory}, re-export it with 'python crop_recommendation_model.py --export-artifact'")
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable model artifact {directory}: {e}")
+
+    # Imported here so app startup does not load joblib, numpy and scikit-learn
+    import joblib
+
+    start = time.perf_counter()
+    model_package = joblib.load(model_path)
+    load_time = time.perf_counter() - start
+
+    lookup_table = load_lookup_table(lookup_table_path(model_path), checksum)
+
+    return LoadedModel(model_path, model_package, checksum, load_time, lookup_table)
+
+def get_model(model_path=None):
+    """Get the shared model for this process, loading it on first use"""
+    model_path = os.path.abspath(model_path or get_model_path())
+
+    loaded = _models.get(model_path)
+    if loaded is not None:
+        return loaded
+
+    with _lock:
+        loaded = _models.get(model_path)
+        if loaded is None:
+            loaded = load_model(model_path)
+            _models[model_path] = loaded
+
+    return loaded
+
+def is_loaded(model_path=None):
+    """Check whether the model at the given path is loaded in this process, without loading it"""
+    return os.path.abspath(model_path or get_model_path()) in _models
+
+def reload_model(model_path=None):
+    """Force the model at the given path to be loaded again"""
+    model_path = os.path.abspath(model_path or get_model_path())
+
+    loaded = load_model(model_path)
+    with _lock:
+        _models[model_path] = loaded
+
+    return loaded
+
+def loaded_models():
+    """Get metadata for every model loaded in this process"""
+    return [loaded.to_dict() for loaded in list(_models.values())]
@@ -0,0 +1,101 @@
+import base64
+import binascii
+import json
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+from app.models import Seller, SellerCrop
+
+def listing_sort_keys():
+    """Sort keys for crop listings: verified sellers first, then cheapest, unpriced last"""
+    return [
+        (Seller.is_verified, True),
+        (SellerCrop.price_per_kg.is_(None), False),
+        (SellerCrop.price_per_kg, False),
+        (SellerCrop.id, False)
+    ]
+
+def listing_cursor_values(seller, crop):
+    """Get the sort key values of one listing row"""
+    # Flags are stored as 0/1, SQLAlchemy only allows == and IS with True/False
+    return [int(bool(seller.is_verified)), int(crop.price_per_kg is None), crop.price_per_kg, crop.id]
+
+def encode_cursor(values):
+    """Get an opaque URL-safe cursor for a row's sort key values"""
+    data = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key_count):
+    """Get the sort key values back from a cursor"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data.decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != key_count:
+        raise ValueError('Invalid cursor')
+    return values
+
+def keyset_filter(keys, values):
+    """Get a filter for rows that sort after the given key values
+
+    Expands (k1, k2, ...) > (v1, v2, ...) into an OR of prefixes so each key
+    can have its own direction. A NULL value has no rows strictly after it
+    within its group, so it only contributes an IS NULL equality.
+    """
+    clauses = []
+    equal = []
+    for (column, descending), value in zip(keys, values):
+        if value is not None:
+            clauses.append(and_(*equal, column < value if descending else column > value))
+            equal.append(column == value)
+        else:
+            equal.append(column.is_(None))
+    return or_(*clauses)
+
+def get_page_args():
+    """Get cursor, page size and whether to count the total from the request"""
+    default_size = current_app.config.get('POSTS_PER_PAGE', 20)
+    max_size = current_app.config.get('MAX_PAGE_SIZE', 100)
+
+    limit = request.args.get('limit', request.args.get('per_page', default_size, type=int), type=int)
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+
+    return request.args.get('cursor') or None, max(1, min(limit, max_size)), include_total
+
+def approximate_count(query):
+    """Count matching rows up to a cap, so large result sets stay cheap to total"""
+    cap = current_app.config.get('APPROXIMATE_TOTAL_CAP', 1000)
+    count = query.order_by(None).limit(cap + 1).count()
+    return {
+        'total': min(count, cap),
+        'total_is_lower_bound': count > cap
+    }
+
+def paginate_keyset(query, keys, row_values, cursor=None, limit=20, include_total=False):
+    """Get one page of rows after the cursor, ordered by the sort keys
+
+    Returns the rows and a pagination dict with the cursor of the next page.
+    """
+    total = approximate_count(query) if include_total else None
+
+    if cursor:
+        query = query.filter(keyset_filter(keys, decode_cursor(cursor, len(keys))))
+
+    order_by = [column.desc() if descending else column.asc() for column, descending in keys]
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    pagination = {
+        'per_page': limit,
+        'has_next': has_next,
+        'next_cursor': encode_cursor(row_values(rows[-1])) if has_next else None
+    }
+    if total is not None:
+        pagination.update(total)
+
+    return rows, pagination
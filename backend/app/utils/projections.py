@@ -0,0 +1,44 @@
+from flask import request
+from sqlalchemy.orm import load_only
+
+from app.models import Seller, SellerCrop
+
+# Field sets a list endpoint can return with ?fields=
+FIELD_SETS = ('summary', 'full')
+
+# Columns that summaries and search results read; the long Text columns
+# (opening hours, services, description, cultivation details) are left unloaded
+SELLER_SUMMARY_COLUMNS = [
+    Seller.id, Seller.business_name, Seller.shop_name, Seller.contact_number, Seller.address_line_1,
+    Seller.province_id, Seller.district_id, Seller.city_id, Seller.is_verified,
+    Seller.delivery_available, Seller.home_delivery, Seller.pickup_available
+]
+
+CROP_SUMMARY_COLUMNS = [
+    SellerCrop.id, SellerCrop.seller_id, SellerCrop.crop_name, SellerCrop.crop_id, SellerCrop.crop_variety,
+    SellerCrop.version, SellerCrop.is_available, SellerCrop.quantity_available, SellerCrop.minimum_order,
+    SellerCrop.price_per_kg, SellerCrop.price_per_unit, SellerCrop.unit_type, SellerCrop.harvest_season,
+    SellerCrop.quality_grade, SellerCrop.organic_certified, SellerCrop.pesticide_free
+]
+
+def get_fields_arg(default='summary'):
+    """Get the requested field set, raising ValueError for an unknown one"""
+    fields = request.args.get('fields', default)
+    if fields not in FIELD_SETS:
+        raise ValueError(f'fields must be one of: {", ".join(FIELD_SETS)}')
+    return fields
+
+def seller_summary_options():
+    """Get loader options that select only the seller summary columns
+
+    Reading any other column raises instead of quietly loading it row by row.
+    """
+    return load_only(*SELLER_SUMMARY_COLUMNS, raiseload=True)
+
+def crop_summary_options():
+    """Get loader options that select only the crop summary columns"""
+    return load_only(*CROP_SUMMARY_COLUMNS, raiseload=True)
+
+def listing_summary_options():
+    """Get loader options for a query over sellers and their crops"""
+    return [seller_summary_options(), crop_summary_options()]
@@ -0,0 +1,24 @@
+from sqlalchemy import event
+
+class QueryCounter:
+    """Count the SQL statements an engine executes inside a with block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self):
+        return len(self.statements)
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import case, event, func, select, true
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Seller, SellerCrop
+from app.utils.location_cache import get_location_index
+
+# Most recently used seller dashboards, dropped when one of the seller's crops changes
+_dashboards = OrderedDict()
+_generation = 0
+_lock = threading.Lock()
+
+RECENT_CROPS = 5
+
+def invalidate_seller_dashboards(seller_ids=None):
+    """Drop the cached dashboards of some sellers, or of every seller"""
+    global _generation
+    with _lock:
+        if seller_ids is None:
+            _dashboards.clear()
+        else:
+            for seller_id in seller_ids:
+                _dashboards.pop(seller_id, None)
+        _generation += 1
+
+def dashboard_query(seller_id):
+    """Get one statement for a seller's row, crop statistics and most recent crops
+
+    The statistics are a single aggregate over the seller's crops and the
+    recent crops a top-N over the same index, cross joined onto the seller
+    row. A seller without crops still gets one row, with NULL crop columns.
+    """
+    available = SellerCrop.is_available == True
+    stats = select(
+        func.count(SellerCrop.id).label('total_crops'),
+        func.coalesce(func.sum(case((available, 1), else_=0)), 0).label('available_crops'),
+        func.coalesce(func.sum(case((available, SellerCrop.quantity_available), else_=0)), 0).label('total_quantity')
+    ).where(SellerCrop.seller_id == seller_id).subquery('stats')
+
+    recent = select(
+        SellerCrop.id, SellerCrop.crop_name, SellerCrop.price_per_kg,
+        SellerCrop.quantity_available, SellerCrop.is_available, SellerCrop.created_at
+    ).where(
+        SellerCrop.seller_id == seller_id
+    ).order_by(
+        SellerCrop.created_at.desc(), SellerCrop.id.desc()
+    ).limit(RECENT_CROPS).subquery('recent')
+
+    return select(
+        Seller.id, Seller.business_name, Seller.contact_number, Seller.address_line_1,
+        Seller.province_id, Seller.district_id, Seller.city_id,
+        stats.c.total_crops, stats.c.available_crops, stats.c.total_quantity,
+        recent.c.id.label('crop_id'), recent.c.crop_name, recent.c.price_per_kg,
+        recent.c.quantity_available, recent.c.is_available, recent.c.created_at
+    ).select_from(
+        Seller
+    ).join(
+        stats, true()
+    ).outerjoin(
+        recent, true()
+    ).where(
+        Seller.id == seller_id
+    ).order_by(
+        recent.c.created_at.desc(), recent.c.id.desc()
+    )
+
+def build_seller_dashboard(seller_id):
+    """Get a seller's dashboard in one round trip, or None if the seller does not exist"""
+    rows = db.session.execute(dashboard_query(seller_id)).all()
+    if not rows:
+        return None
+
+    seller = rows[0]
+    locations = get_location_index()
+    name = lambda item: item['name'] if item else None
+
+    return {
+        'seller_info': {
+            'id': seller.id,
+            'business_name': seller.business_name,
+            'contact_number': seller.contact_number,
+            'address': seller.address_line_1,
+            'location': {
+                'province': name(locations.provinces.get(seller.province_id)),
+                'district': name(locations.districts.get(seller.district_id)),
+                'city': name(locations.cities.get(seller.city_id))
+            }
+        },
+        'statistics': {
+            'total_crops': seller.total_crops,
+            'available_crops': seller.available_crops,
+            'total_quantity': seller.total_quantity
+        },
+        'recent_crops': [
+            {
+                'id': row.crop_id,
+                'crop_name': row.crop_name,
+                'price_per_kg': row.price_per_kg,
+                'quantity_available': row.quantity_available,
+                'is_available': row.is_available,
+                'created_at': row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows if row.crop_id is not None
+        ]
+    }
+
+def get_seller_dashboard(seller_id):
+    """Get a seller's dashboard, from the cache while it is fresh"""
+    ttl = current_app.config.get('SELLER_DASHBOARD_TTL', 60)
+    entry = _dashboards.get(seller_id)
+    if entry is not None and time.monotonic() - entry[0] <= ttl:
+        with _lock:
+            if seller_id in _dashboards:
+                _dashboards.move_to_end(seller_id)
+        return entry[1]
+
+    generation = _generation
+    dashboard = build_seller_dashboard(seller_id)
+    if dashboard is None:
+        return None
+
+    with _lock:
+        # Keep the result only if no write was committed while building it
+        if generation == _generation:
+            _dashboards[seller_id] = (time.monotonic(), dashboard)
+            _dashboards.move_to_end(seller_id)
+            while len(_dashboards) > current_app.config.get('SELLER_DASHBOARD_CACHE_SIZE', 1024):
+                _dashboards.popitem(last=False)
+
+    return dashboard
+
+def mark_seller_dashboard_changed(session, seller_id):
+    """Drop a seller's dashboard when the session commits, for bulk writes that skip the flush events"""
+    session.info.setdefault('dashboard_sellers_changed', set()).add(seller_id)
+
+@event.listens_for(Session, 'after_flush')
+def _track_dashboard_changes(session, flush_context):
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, SellerCrop):
+            mark_seller_dashboard_changed(session, obj.seller_id)
+        elif isinstance(obj, Seller):
+            mark_seller_dashboard_changed(session, obj.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    seller_ids = session.info.pop('dashboard_sellers_changed', None)
+    if seller_ids:
+        invalidate_seller_dashboards(seller_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dashboard_sellers_changed', None)
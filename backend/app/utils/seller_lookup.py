@@ -0,0 +1,92 @@
+# Seller lookup for the standalone simple_api server. Plain DB-API code, so it
+# runs on mysql.connector in production and on sqlite3 in tests.
+
+SELLER_COLUMNS = """
+    sc.id as seller_crop_id,
+    sc.crop_name,
+    sc.crop_variety,
+    sc.is_available,
+    sc.price_per_kg,
+    sc.price_per_unit,
+    sc.unit_type,
+    sc.quantity_available,
+    sc.minimum_order,
+    sc.harvest_season,
+    sc.best_quality_months,
+    sc.quality_grade,
+    sc.organic_certified,
+    sc.pesticide_free,
+    s.id as seller_id,
+    s.business_name,
+    s.business_type,
+    s.contact_number,
+    s.secondary_contact,
+    s.business_email,
+    s.website,
+    s.address_line_1,
+    s.address_line_2,
+    s.postal_code,
+    s.shop_name,
+    s.shop_type,
+    s.establishment_year,
+    s.is_verified,
+    s.is_active,
+    s.description,
+    p.name as province_name,
+    d.name as district_name,
+    c.name as city_name"""
+
+# Every crop_cultivations column, selected as cc_<column> and nested under cultivation_info
+CULTIVATION_COLUMNS = [
+    'id', 'seller_crop_id', 'seed_nursery', 'land_preparation', 'planting',
+    'crop_management', 'seed_requirements', 'cultivation_steps', 'irrigation_method',
+    'fertilizer_used', 'pest_control_methods', 'harvesting_method', 'post_harvest_handling',
+    'soil_type', 'water_requirements', 'sunlight_requirements', 'temperature_range',
+    'planting_season', 'growing_duration_days', 'created_at', 'updated_at'
+]
+
+CULTIVATION_PREFIX = 'cc_'
+
+def build_sellers_query(placeholder='%s'):
+    """Build the seller query for a crop, with cultivation info joined in
+
+    crop_cultivations.seller_crop_id is unique, so the LEFT JOIN adds at most
+    one row per listing.
+    """
+    cultivation_columns = ',\n'.join(f'    cc.{column} as {CULTIVATION_PREFIX}{column}' for column in CULTIVATION_COLUMNS)
+    return f"""
+        SELECT {SELLER_COLUMNS},
+{cultivation_columns}
+        FROM seller_crops sc
+        JOIN sellers s ON sc.seller_id = s.id
+        LEFT JOIN provinces p ON s.province_id = p.id
+        LEFT JOIN districts d ON s.district_id = d.id
+        LEFT JOIN cities c ON s.city_id = c.id
+        LEFT JOIN crop_cultivations cc ON cc.seller_crop_id = sc.id
+        WHERE LOWER(sc.crop_name) = LOWER({placeholder})
+        AND sc.is_available = true
+        AND s.is_active = true
+        ORDER BY s.is_verified DESC, sc.price_per_kg ASC
+    """
+
+def split_cultivation(row):
+    """Move the cc_ columns of a joined row into cultivation_info (None without a cultivation row)"""
+    seller = {}
+    cultivation = {}
+    for key, value in row.items():
+        if key.startswith(CULTIVATION_PREFIX):
+            cultivation[key[len(CULTIVATION_PREFIX):]] = value
+        else:
+            seller[key] = value
+    seller['cultivation_info'] = cultivation if cultivation['id'] is not None else None
+    return seller
+
+def fetch_sellers_for_crop(connection, crop_name, placeholder='%s'):
+    """Get available sellers of a crop with their cultivation info in one query"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(build_sellers_query(placeholder), (crop_name,))
+        columns = [column[0] for column in cursor.description]
+        return [split_cultivation(dict(zip(columns, row))) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
@@ -13,8 +13,33 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads')
     
+    # ML model settings
+    MODEL_PATH = os.environ.get('MODEL_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'routes', 'crop_recommendation_model.pkl')
+    BUYER_MODEL_PATH = os.environ.get('BUYER_MODEL_PATH')  # Model for /api/buyer-full/recommend-crop, MODEL_PATH if unset
+    TEST_MODEL_PATH = os.environ.get('TEST_MODEL_PATH')  # Model for /api/test/buyer/recommend-crop-test, MODEL_PATH if unset
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))  # Samples per batch recommendation
+    
+    # Inventory import settings
+    MAX_BULK_IMPORT_ROWS = int(os.environ.get('MAX_BULK_IMPORT_ROWS', 50000))  # Rows per /api/seller/crops/bulk upload
+    MAX_CHANGES_PAGE_SIZE = int(os.environ.get('MAX_CHANGES_PAGE_SIZE', 1000))  # Crops per change feed page or inventory PATCH
+    SYNC_LAG_SECONDS = int(os.environ.get('SYNC_LAG_SECONDS', 5))  # Change feed re-sends this much history behind a sync token
+    
+    # Cache settings
+    CROP_AVAILABILITY_TTL = int(os.environ.get('CROP_AVAILABILITY_TTL', 60))  # Seconds before per-crop seller counts are rebuilt
+    DASHBOARD_STATS_RECONCILE_INTERVAL = int(os.environ.get('DASHBOARD_STATS_RECONCILE_INTERVAL', 300))  # Seconds between dashboard counter rebuilds
+    LOCATION_CACHE_MAX_AGE = int(os.environ.get('LOCATION_CACHE_MAX_AGE', 300))  # Seconds browsers may reuse location responses
+    DIAGNOSTICS_TTL = int(os.environ.get('DIAGNOSTICS_TTL', 30))  # Seconds before diagnostics row counts are recounted
+    SELLER_DASHBOARD_TTL = int(os.environ.get('SELLER_DASHBOARD_TTL', 60))  # Seconds a cached seller dashboard is served without crop writes
+    SELLER_DASHBOARD_CACHE_SIZE = int(os.environ.get('SELLER_DASHBOARD_CACHE_SIZE', 1024))  # Seller dashboards kept per process
+    
     # Pagination
     POSTS_PER_PAGE = 20
+    MAX_PAGE_SIZE = 100
+    APPROXIMATE_TOTAL_CAP = 1000  # include_total counts at most this many rows
+    
+    # Startup settings
+    INIT_DATABASE_ON_STARTUP = True  # Create tables and seed data in create_app, else run `flask init-db`
+    REGISTER_DEBUG_BLUEPRINTS = True  # /api/buyer/test and /api/test
     
     # CORS settings
     CORS_ORIGINS = ["http://localhost:3000", "http://localhost:3001", "http://127.0.0.1:3000", "http://127.0.0.1:3001"]
@@ -26,6 +51,8 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    INIT_DATABASE_ON_STARTUP = False
+    REGISTER_DEBUG_BLUEPRINTS = False
 
 class TestingConfig(Config):
     """Testing configuration"""
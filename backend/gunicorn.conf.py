@@ -0,0 +1,78 @@
+"""
+Gunicorn settings for the Crop Recommendation API
+
+The app and ML model are loaded once in the master process and workers are
+forked from it, so every worker shares the model's memory copy-on-write.
+Send SIGHUP to the master (or set MODEL_RELOAD_INTERVAL) to load a new model
+pickle and gracefully replace the workers.
+"""
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('FLASK_PORT', 5000)}")
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+preload_app = True
+
+# Seconds between checks of the model file for a new pickle, 0 disables the check
+model_reload_interval = int(os.environ.get('MODEL_RELOAD_INTERVAL', 0))
+
+def model_file_state(path):
+    """Get the modification time and size of a file, None if it does not exist"""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+    except OSError:
+        return None
+
+def watch_model_file(server, path):
+    """Signal the master to reload when the model file changes"""
+    state = model_file_state(path)
+    while True:
+        time.sleep(model_reload_interval)
+        current = model_file_state(path)
+        if current is not None and current != state:
+            state = current
+            server.log.info("Model file %s changed, reloading workers", path)
+            os.kill(server.pid, signal.SIGHUP)
+
+def when_ready(server):
+    # Move everything loaded so far out of the garbage collector's reach, so
+    # collections in the workers do not touch (and copy) the shared pages
+    gc.freeze()
+
+    if model_reload_interval > 0:
+        flask_app = server.app.wsgi()
+        with flask_app.app_context():
+            from app.utils.model_registry import configured_model_paths
+            paths = configured_model_paths()
+        for path in paths:
+            threading.Thread(target=watch_model_file, args=(server, path), daemon=True).start()
+
+def on_reload(server):
+    # Runs in the master before the new workers fork
+    flask_app = server.app.wsgi()
+    with flask_app.app_context():
+        from app.utils.model_registry import configured_model_paths, reload_model
+        for path in configured_model_paths():
+            try:
+                loaded_model = reload_model(path)
+                server.log.info("Reloaded ML model %s from %s", loaded_model.version, path)
+            except Exception as e:
+                # A missing or half-written pickle keeps the current model
+                server.log.error("Model reload of %s failed, keeping the current model: %s", path, e)
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared between workers
+    flask_app = server.app.wsgi()
+    with flask_app.app_context():
+        from app import db
+        db.engine.dispose(close=False)
@@ -5,28 +5,63 @@ Enhanced API server for crop recommendation with seller lookup
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
-import joblib
-import pandas as pd
-import mysql.connector
+import threading
+import time
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+from app.utils.inference import bin_sample, encode_sample, score_sample
+from app.utils.model_registry import get_model
+from app.utils.seller_lookup import fetch_sellers_for_crop
 
 app = Flask(__name__)
 CORS(app)
 
+MODEL_PATH = os.path.join('backend', 'app', 'routes', 'crop_recommendation_model.pkl')
+
+# Connections are reused from a bounded pool instead of opened per request
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', '127.0.0.1'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'crop_recommendation'),
+    'port': int(os.environ.get('DB_PORT', 3306))
+}
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+# Seconds a request waits for a pooled connection to be returned before giving up
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 2))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Get the shared connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MySQLConnectionPool(pool_name='simple_api', pool_size=DB_POOL_SIZE, **DB_CONFIG)
+    return _pool
+
+class PoolExhausted(Exception):
+    """No pooled connection was returned within DB_POOL_TIMEOUT"""
+
 def get_database_connection():
-    """Get database connection"""
-    try:
-        connection = mysql.connector.connect(
-            host='127.0.0.1',
-            user='root',
-            password='',
-            database='crop_recommendation',
-            port=3306
-        )
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+    """Get a pooled database connection, closing it returns it to the pool
+
+    Waits up to DB_POOL_TIMEOUT seconds while every connection is in use,
+    then raises PoolExhausted.
+    """
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+    while True:
+        try:
+            return get_connection_pool().get_connection()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise PoolExhausted('All database connections are busy, try again shortly')
+            time.sleep(0.05)
+        except Error as e:
+            print(f"Database connection error: {e}")
+            return None
 
 def find_sellers_for_crop(crop_name):
     """Find sellers who have the predicted crop available"""
@@ -35,77 +70,13 @@ def find_sellers_for_crop(crop_name):
         return []
     
     try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Query to find sellers with the predicted crop
-        query = """
-            SELECT 
-                sc.id as seller_crop_id,
-                sc.crop_name,
-                sc.crop_variety,
-                sc.is_available,
-                sc.price_per_kg,
-                sc.price_per_unit,
-                sc.unit_type,
-                sc.quantity_available,
-                sc.minimum_order,
-                sc.harvest_season,
-                sc.best_quality_months,
-                sc.quality_grade,
-                sc.organic_certified,
-                sc.pesticide_free,
-                s.id as seller_id,
-                s.business_name,
-                s.business_type,
-                s.contact_number,
-                s.secondary_contact,
-                s.business_email,
-                s.website,
-                s.address_line_1,
-                s.address_line_2,
-                s.postal_code,
-                s.shop_name,
-                s.shop_type,
-                s.establishment_year,
-                s.is_verified,
-                s.is_active,
-                s.description,
-                p.name as province_name,
-                d.name as district_name,
-                c.name as city_name
-            FROM seller_crops sc
-            JOIN sellers s ON sc.seller_id = s.id
-            LEFT JOIN provinces p ON s.province_id = p.id
-            LEFT JOIN districts d ON s.district_id = d.id
-            LEFT JOIN cities c ON s.city_id = c.id
-            WHERE LOWER(sc.crop_name) = LOWER(%s)
-            AND sc.is_available = true
-            AND s.is_active = true
-            ORDER BY s.is_verified DESC, sc.price_per_kg ASC
-        """
-        
-        cursor.execute(query, (crop_name,))
-        sellers = cursor.fetchall()
-        
-        # Get cultivation details for each seller crop
-        for seller in sellers:
-            cultivation_query = """
-                SELECT * FROM crop_cultivations 
-                WHERE seller_crop_id = %s
-            """
-            cursor.execute(cultivation_query, (seller['seller_crop_id'],))
-            cultivation_info = cursor.fetchone()
-            seller['cultivation_info'] = cultivation_info
-        
-        cursor.close()
-        return sellers
+        return fetch_sellers_for_crop(connection, crop_name)
         
     except Error as e:
         print(f"Database query error: {e}")
         return []
     finally:
-        if connection.is_connected():
-            connection.close()
+        connection.close()
 
 @app.route('/predict', methods=['POST'])
 def predict_crop():
@@ -113,6 +84,24 @@ def predict_crop():
     try:
         data = request.get_json()
         
+        # Get the shared ML model
+        try:
+            loaded_model = get_model(MODEL_PATH)
+        except FileNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 500
+        
+        # Raw sensor readings are binned with the thresholds stored in the model package
+        try:
+            data = bin_sample(loaded_model.feature_bins, data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # Validate required fields
         required_fields = [
             'nitrogen_level', 'phosphorous_level', 'potassium_level',
@@ -126,48 +115,11 @@ def predict_crop():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Load the ML model
-        model_path = os.path.join('backend', 'app', 'routes', 'crop_recommendation_model.pkl')
-        
-        if not os.path.exists(model_path):
-            return jsonify({
-                'success': False,
-                'message': f'ML model not found at: {model_path}'
-            }), 500
+        # Encode features straight into the model's feature array
+        X_input = encode_sample(loaded_model.code_maps, data)
         
-        # Load model and make prediction
-        model_package = joblib.load(model_path)
-        model = model_package['model']
-        encoders = model_package['encoders']
-        
-        # Prepare input data
-        input_data = pd.DataFrame({
-            'N_cat': [data['nitrogen_level']],
-            'P_cat': [data['phosphorous_level']],
-            'K_cat': [data['potassium_level']],
-            'temperature_cat': [data['temperature_level']],
-            'humidity_cat': [data['humidity_level']],
-            'ph_cat': [data['ph_level']],
-            'rainfall_cat': [data['rainfall_level']]
-        })
-        
-        # Encode features
-        for col in input_data.columns:
-            if col in encoders:
-                input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
-        
-        # Prepare features for prediction
-        feature_cols = [col + '_encoded' for col in ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 'humidity_cat', 'ph_cat', 'rainfall_cat']]
-        X_input = input_data[feature_cols]
-        
-        # Make prediction
-        prediction = model.predict(X_input)[0]
-        
-        # Get confidence
-        confidence = 0.0
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X_input)[0]
-            confidence = float(max(probabilities))
+        # Score once: crop, confidence and ranked alternatives come from one probability vector
+        prediction, confidence, top_predictions = score_sample(loaded_model, X_input)
         
         # Find sellers for the predicted crop
         sellers = find_sellers_for_crop(prediction)
@@ -178,7 +130,8 @@ def predict_crop():
             'recommendation': {
                 'crop': prediction,
                 'confidence': confidence,
-                'confidence_percentage': round(confidence * 100, 2)
+                'confidence_percentage': round(confidence * 100, 2),
+                'top_predictions': top_predictions
             },
             'input_conditions': {
                 'nitrogen': data['nitrogen_level'],
@@ -200,6 +153,12 @@ def predict_crop():
         
         return jsonify(response_data)
         
+    except PoolExhausted as e:
+        # A busy pool is not the same as no sellers, let the client retry
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             'success': False,
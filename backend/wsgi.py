@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Production WSGI entry point for the Crop Recommendation API
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from app import create_app
+from app.utils.model_registry import configured_model_paths, get_model
+
+# Create Flask application
+app = create_app(os.environ.get('FLASK_ENV', 'production'))
+
+def preload_model():
+    """Load the ML models before workers fork so they share their memory pages"""
+    with app.app_context():
+        for model_path in configured_model_paths():
+            try:
+                loaded_model = get_model(model_path)
+                print(f"Preloaded ML model {loaded_model.version} from {loaded_model.path}")
+            except Exception as e:
+                # Workers start anyway, /readyz reports not ready until a reload succeeds
+                print(f"WARNING: ML model {model_path} not loaded: {e}")
+
+preload_model()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Latency, throughput and memory benchmark for the crop recommendation stack
+
+Results are written as JSON so runs from different commits can be compared:
+
+    python benchmark.py --output benchmark_results/before.json
+    python benchmark.py --compare benchmark_results/before.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+DEFAULT_MODEL_PATH = os.path.join('backend', 'app', 'routes', 'crop_recommendation_model.pkl')
+
+SAMPLE = {
+    'nitrogen_level': 'High',
+    'phosphorous_level': 'Medium',
+    'potassium_level': 'Medium',
+    'temperature_level': 'Warm',
+    'humidity_level': 'Humid',
+    'ph_level': 'Neutral',
+    'rainfall_level': 'High'
+}
+
+def random_samples(loaded_model, count, seed=42):
+    """Draw valid samples uniformly from the categorical input grid"""
+    from app.utils.inference import FEATURE_FIELDS
+
+    rng = np.random.default_rng(seed)
+    columns = {
+        field: rng.choice(list(loaded_model.code_maps[col]), size=count)
+        for field, col in FEATURE_FIELDS
+    }
+    return [{field: str(columns[field][i]) for field in columns} for i in range(count)]
+
+def percentiles(timings):
+    timings_ms = np.array(timings) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 4),
+        'p99_ms': round(float(np.percentile(timings_ms, 99)), 4),
+        'mean_ms': round(float(timings_ms.mean()), 4)
+    }
+
+def time_calls(func, samples):
+    timings = []
+    for sample in samples:
+        start = time.perf_counter()
+        func(sample)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def peak_memory(func):
+    """Run func once and get the peak Python allocation in MB"""
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / (1024 * 1024), 3)
+
+def max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def joblib_per_request(model_path):
+    """The original path: unpickle the model and encode with pandas on every request"""
+    def predict(data):
+        model_package = joblib.load(model_path)
+        model = model_package['model']
+        encoders = model_package['encoders']
+        input_data = pd.DataFrame({
+            'N_cat': [data['nitrogen_level']],
+            'P_cat': [data['phosphorous_level']],
+            'K_cat': [data['potassium_level']],
+            'temperature_cat': [data['temperature_level']],
+            'humidity_cat': [data['humidity_level']],
+            'ph_cat': [data['ph_level']],
+            'rainfall_cat': [data['rainfall_level']]
+        })
+        for col in input_data.columns:
+            input_data[col + '_encoded'] = encoders[col].transform(input_data[col])
+        X_input = input_data[[col + '_encoded' for col in input_data.columns if not col.endswith('_encoded')]]
+        model.predict(X_input)
+        model.predict_proba(X_input)
+    return predict
+
+def cached_model_pandas(loaded_model):
+    """Model loaded once, still encoded through pandas and LabelEncoder"""
+    from app.utils.inference import FEATURE_FIELDS
+
+    def predict(data):
+        input_data = pd.DataFrame({col: [data[field]] for field, col in FEATURE_FIELDS})
+        for col in list(input_data.columns):
+            input_data[col + '_encoded'] = loaded_model.encoders[col].transform(input_data[col])
+        X_input = input_data[[col + '_encoded' for _, col in FEATURE_FIELDS]]
+        loaded_model.model.predict_proba(X_input)
+    return predict
+
+def pandas_free_encoder(loaded_model):
+    """Cached model, numpy encoding and one predict_proba call"""
+    from app.utils.inference import encode_sample, score_sample
+
+    def predict(data):
+        lookup_table = loaded_model.lookup_table
+        loaded_model.lookup_table = None
+        try:
+            score_sample(loaded_model, encode_sample(loaded_model.code_maps, data))
+        finally:
+            loaded_model.lookup_table = lookup_table
+    return predict
+
+def grid_lookup(loaded_model):
+    """Cached model answered from the precomputed lookup table"""
+    from app.utils.inference import encode_sample, score_sample
+
+    def predict(data):
+        score_sample(loaded_model, encode_sample(loaded_model.code_maps, data))
+    return predict
+
+def benchmark_stages(model_path, requests, batch_size):
+    from app.utils.inference import recommend_batch
+    from app.utils.model_registry import load_model
+
+    results = {}
+
+    start = time.perf_counter()
+    loaded_model = load_model(model_path)
+    results['cold_start'] = {
+        'model_load_ms': round((time.perf_counter() - start) * 1000, 2),
+        'unpickle_ms': round(loaded_model.load_time * 1000, 2),
+        'format': loaded_model.format,
+        'lookup_table_loaded': loaded_model.lookup_table is not None
+    }
+
+    samples = random_samples(loaded_model, requests)
+    batch = random_samples(loaded_model, batch_size, seed=7)
+
+    stages = {
+        'joblib_per_request': joblib_per_request(model_path),
+        'cached_model': cached_model_pandas(loaded_model),
+        'pandas_free_encoder': pandas_free_encoder(loaded_model),
+        'grid_lookup': grid_lookup(loaded_model)
+    }
+
+    for name, predict in stages.items():
+        if name == 'grid_lookup' and loaded_model.lookup_table is None:
+            print(f"  {name}: skipped (no lookup table next to the model)")
+            continue
+
+        # The per-request unpickle path is slow, a smaller sample is enough
+        stage_samples = samples[:max(20, requests // 20)] if name == 'joblib_per_request' else samples
+        predict(stage_samples[0])
+        stats = percentiles(time_calls(predict, stage_samples))
+        stats['requests'] = len(stage_samples)
+        stats['peak_memory_mb'] = peak_memory(lambda: predict(stage_samples[0]))
+        results[name] = stats
+        print(f"  {name}: p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms peak={stats['peak_memory_mb']}MB")
+
+    # Batch throughput through the shared batch scorer, with and without the lookup table
+    for name, lookup_table in [('batch_model', None), ('batch_lookup', loaded_model.lookup_table)]:
+        if name == 'batch_lookup' and lookup_table is None:
+            continue
+        saved = loaded_model.lookup_table
+        loaded_model.lookup_table = lookup_table
+        try:
+            start = time.perf_counter()
+            recommend_batch(loaded_model, batch)
+            elapsed = time.perf_counter() - start
+            peak = peak_memory(lambda: recommend_batch(loaded_model, batch))
+        finally:
+            loaded_model.lookup_table = saved
+        results[name] = {
+            'rows': batch_size,
+            'total_ms': round(elapsed * 1000, 2),
+            'rows_per_sec': round(batch_size / elapsed, 1),
+            'peak_memory_mb': peak
+        }
+        print(f"  {name}: {results[name]['rows_per_sec']} rows/s peak={peak}MB")
+
+    return results
+
+def benchmark_api(model_path, requests, batch_size, import_rows):
+    """Benchmark the Flask endpoints through the test client with in-memory SQLite"""
+    os.environ['MODEL_PATH'] = os.path.abspath(model_path)
+
+    start = time.perf_counter()
+    from app import create_app
+    app = create_app('testing')
+    app.config['MODEL_PATH'] = os.path.abspath(model_path)
+    client = app.test_client()
+    results = {'app_startup_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+    from app.utils.model_registry import get_model
+    with app.app_context():
+        loaded_model = get_model()
+    samples = random_samples(loaded_model, requests)
+    batch = random_samples(loaded_model, batch_size, seed=7)
+
+    for name, url in [('recommend_crop', '/api/recommend-crop'), ('recommend_crop_full', '/api/buyer/recommend-crop-full')]:
+        client.post(url, json=SAMPLE)
+        timings = time_calls(lambda sample: client.post(url, json=sample), samples)
+        results[name] = percentiles(timings)
+        results[name]['requests'] = len(samples)
+        print(f"  POST {url}: p50={results[name]['p50_ms']}ms p99={results[name]['p99_ms']}ms")
+
+    start = time.perf_counter()
+    response = client.post('/api/recommend-crop/batch', json=batch)
+    elapsed = time.perf_counter() - start
+    results['recommend_crop_batch'] = {
+        'rows': batch_size,
+        'status_code': response.status_code,
+        'total_ms': round(elapsed * 1000, 2),
+        'rows_per_sec': round(batch_size / elapsed, 1)
+    }
+    print(f"  POST /api/recommend-crop/batch: {results['recommend_crop_batch']['rows_per_sec']} rows/s")
+
+    seller_id = create_benchmark_seller(app, 'Benchmark Wholesaler')
+    results['inventory_import'] = benchmark_inventory_import(app, client, seller_id, import_rows)
+    results['seller_dashboard'] = benchmark_seller_dashboard(app, client, seller_id, requests)
+
+    return results
+
+def inventory_csv(rows, price=100):
+    lines = ['crop_name,crop_variety,price_per_kg,quantity_available,quality_grade']
+    lines += [f'rice,SKU-{i},{price + i % 50},{10 + i % 90},Grade A' for i in range(rows)]
+    return '\n'.join(lines) + '\n'
+
+def create_benchmark_seller(app, name):
+    """Add a seller with no crops and get its id"""
+    from app import db
+    from app.models import User, Seller
+
+    with app.app_context():
+        user = User(email=f"benchmark-{name.lower().replace(' ', '-')}@example.com", user_type='seller')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.flush()
+        seller = Seller(
+            user_id=user.id, business_name=name, contact_number='0771234567',
+            address_line_1='1 Main Street', province_id=1, district_id=1, city_id=1
+        )
+        db.session.add(seller)
+        db.session.commit()
+        return seller.id
+
+def benchmark_inventory_import(app, client, seller_id, rows):
+    """Compare per-crop POSTs with the bulk import for inserting and then updating rows"""
+    results = {}
+
+    # One request per crop, as add_crop requires; sampled so the run stays short
+    single_rows = min(rows, 1000)
+    start = time.perf_counter()
+    for i in range(single_rows):
+        client.post('/api/seller/crops', json={'seller_id': seller_id, 'crop_name': 'maize', 'crop_variety': f'SKU-{i}', 'price_per_kg': 80})
+    elapsed = time.perf_counter() - start
+    results['add_crop_per_row'] = {'rows': single_rows, 'total_ms': round(elapsed * 1000, 2), 'rows_per_sec': round(single_rows / elapsed, 1)}
+    print(f"  POST /api/seller/crops, one row per request: {results['add_crop_per_row']['rows_per_sec']} rows/s")
+
+    url = f'/api/seller/crops/bulk?seller_id={seller_id}'
+    for name, body in [('bulk_insert', inventory_csv(rows)), ('bulk_update', inventory_csv(rows, price=120))]:
+        start = time.perf_counter()
+        response = client.post(url, data=body, content_type='text/csv')
+        elapsed = time.perf_counter() - start
+        report = response.get_json()
+        results[name] = {
+            'rows': rows,
+            'status_code': response.status_code,
+            'inserted': report.get('inserted'),
+            'updated': report.get('updated'),
+            'total_ms': round(elapsed * 1000, 2),
+            'rows_per_sec': round(rows / elapsed, 1)
+        }
+        print(f"  POST /api/seller/crops/bulk ({name.split('_')[1]} {rows} rows): {results[name]['rows_per_sec']} rows/s")
+
+    return results
+
+def benchmark_seller_dashboard(app, client, large_seller_id, requests):
+    """Compare dashboard latency of a five-crop seller and the bulk import seller, with and without the cache"""
+    from app.utils.seller_dashboard import invalidate_seller_dashboards
+
+    small_seller_id = create_benchmark_seller(app, 'Benchmark Smallholder')
+    for crop_name in ['rice', 'maize', 'coffee', 'banana', 'mango']:
+        client.post('/api/seller/crops', json={'seller_id': small_seller_id, 'crop_name': crop_name, 'price_per_kg': 80})
+
+    results = {}
+    calls = range(requests)
+    for size, seller_id in [('small', small_seller_id), ('large', large_seller_id)]:
+        url = f'/api/seller/dashboard/{seller_id}'
+        total_crops = client.get(url).get_json()['dashboard']['statistics']['total_crops']
+
+        def uncached(_):
+            invalidate_seller_dashboards()
+            client.get(url)
+
+        for name, call in [(f'{size}_uncached', uncached), (f'{size}_cached', lambda _: client.get(url))]:
+            results[name] = percentiles(time_calls(call, calls))
+            results[name]['crops'] = total_crops
+            print(f"  GET /api/seller/dashboard ({total_crops} crops, {name.split('_')[1]}): p50={results[name]['p50_ms']}ms p99={results[name]['p99_ms']}ms")
+
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current, path=()):
+    """Print the change of every timing and throughput figure against an earlier run"""
+    for key, value in current.items():
+        old = previous.get(key) if isinstance(previous, dict) else None
+        if isinstance(value, dict):
+            compare(old or {}, value, path + (key,))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(old, (int, float)) and old:
+            if key.endswith('_ms') or key.endswith('_mb') or key == 'rows_per_sec':
+                print(f"  {'.'.join(path + (key,))}: {old} -> {value} ({value / old:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the crop recommendation stack')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='model package to benchmark')
+    parser.add_argument('--requests', type=int, default=500, help='single requests per stage')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per batch')
+    parser.add_argument('--import-rows', type=int, default=10000, help='rows per bulk inventory import')
+    parser.add_argument('--output', help='where to write the JSON results (default: benchmark_results/<commit>.json)')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"ERROR: ML model not found at: {args.model}")
+        sys.exit(1)
+
+    commit = git_commit()
+    print("CROP RECOMMENDATION BENCHMARK")
+    print("=" * 50)
+    print(f"Model: {args.model}  Commit: {commit}")
+
+    print("\nInference stages:")
+    stages = benchmark_stages(args.model, args.requests, args.batch_size)
+
+    print("\nAPI (Flask test client, SQLite):")
+    api = benchmark_api(args.model, args.requests, args.batch_size, args.import_rows)
+
+    results = {
+        'created_at': datetime.now().isoformat(),
+        'commit': commit,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'config': {
+            'model': args.model,
+            'requests': args.requests,
+            'batch_size': args.batch_size
+        },
+        'stages': stages,
+        'api': api,
+        'max_rss_mb': max_rss_mb()
+    }
+
+    output = args.output or os.path.join('benchmark_results', f"{commit or datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\nCompared with {args.compare} (commit {previous.get('commit')}):")
+        compare(previous, results)
+
+if __name__ == "__main__":
+    main()
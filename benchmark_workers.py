@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the production launcher as the worker count grows
+
+Starts gunicorn (backend/gunicorn.conf.py) with 1, 2, 4, ... workers up to the
+number of cores against a throwaway SQLite database, drives it with client
+processes and reports requests per second and speedup over one worker:
+
+    python benchmark_workers.py --duration 10
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+DEFAULT_MODEL_PATH = os.path.join(BACKEND_DIR, 'app', 'routes', 'crop_recommendation_model.pkl')
+
+SAMPLE = {
+    'nitrogen_level': 'High',
+    'phosphorous_level': 'Medium',
+    'potassium_level': 'Medium',
+    'temperature_level': 'Warm',
+    'humidity_level': 'Humid',
+    'ph_level': 'Neutral',
+    'rainfall_level': 'High'
+}
+
+def default_worker_counts():
+    """Powers of two up to the core count, plus the core count itself"""
+    cores = multiprocessing.cpu_count()
+    counts = []
+    count = 1
+    while count < cores:
+        counts.append(count)
+        count *= 2
+    counts.append(cores)
+    return counts
+
+def request(port, path, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        if body is None:
+            connection.request('GET', path)
+        else:
+            connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+def wait_until_ready(port, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited before becoming ready')
+        try:
+            if request(port, '/readyz') == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn did not become ready in time')
+
+def client(args):
+    """Send recommendation requests until the deadline, returning latencies and errors"""
+    port, deadline = args
+    latencies = []
+    errors = 0
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            status = request(port, '/api/recommend-crop', SAMPLE)
+        except OSError:
+            status = None
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    return latencies, errors
+
+def run_load(port, clients, duration):
+    deadline = time.time() + duration
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, [(port, deadline)] * clients)
+
+    latencies = np.array([latency for result in results for latency in result[0]]) * 1000
+    errors = sum(result[1] for result in results)
+    return {
+        'requests': int(latencies.size),
+        'errors': errors,
+        'requests_per_sec': round(latencies.size / duration, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2) if latencies.size else None,
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2) if latencies.size else None
+    }
+
+def benchmark_workers(workers, threads, model_path, duration, port):
+    """Start gunicorn with the given worker count and measure it under load"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            FLASK_ENV='production',
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'benchmark.db')}",
+            MODEL_PATH=os.path.abspath(model_path),
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+            GUNICORN_WORKERS=str(workers),
+            GUNICORN_THREADS=str(threads),
+            MODEL_RELOAD_INTERVAL='0'
+        )
+        # Production startup skips schema work, so create and seed the database first
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'wsgi', 'init-db'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        )
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(port, process)
+            # Warm every worker before measuring
+            run_load(port, workers, 1)
+            return run_load(port, workers * threads * 2, duration)
+        finally:
+            process.terminate()
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gunicorn throughput by worker count')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='model package to serve')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_worker_counts(), help='worker counts to measure')
+    parser.add_argument('--threads', type=int, default=1, help='threads per worker')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per worker count')
+    parser.add_argument('--port', type=int, default=5099, help='port to run gunicorn on')
+    parser.add_argument('--output', help='where to write the JSON results')
+    args = parser.parse_args()
+
+    print(f"Cores: {multiprocessing.cpu_count()}, threads per worker: {args.threads}")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    results = []
+    for workers in args.workers:
+        result = benchmark_workers(workers, args.threads, args.model, args.duration, args.port)
+        result['workers'] = workers
+        baseline = results[0]['requests_per_sec'] if results else result['requests_per_sec']
+        result['speedup'] = round(result['requests_per_sec'] / baseline, 2) if baseline else None
+        results.append(result)
+        print(f"{workers:>8} {result['requests_per_sec']:>10} {result['speedup']:>8} "
+              f"{result['p50_ms']:>8} {result['p99_ms']:>8} {result['errors']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'cores': multiprocessing.cpu_count(), 'threads': args.threads, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == '__main__':
+    main()
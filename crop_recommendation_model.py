@@ -6,82 +6,30 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, f1_score, recall_score, classification_report
 import joblib
+import importlib.util
+import os
+import sys
 import warnings
-warnings.filterwarnings('ignore')
-
-def categorize_nitrogen(n):
-    if n <= 20:
-        return 'Very Low'
-    elif n <= 40:
-        return 'Low'
-    elif n <= 80:
-        return 'Medium'
-    elif n <= 120:
-        return 'High'
-    else:
-        return 'Very High'
+from datetime import datetime
+from feature_binning import FEATURE_BINS, bin_features
 
-def categorize_phosphorous(p):
-    if p <= 25:
-        return 'Very Low'
-    elif p <= 50:
-        return 'Low'
-    elif p <= 75:
-        return 'Medium'
-    elif p <= 100:
-        return 'High'
-    else:
-        return 'Very High'
+def load_backend_module(name):
+    # Load one module of backend/app/utils by path, so training does not import
+    # the Flask app package (and with it Flask, SQLAlchemy and the models)
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'app', 'utils', name + '.py')
+    spec = importlib.util.spec_from_file_location(f'_backend_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
-def categorize_potassium(k):
-    if k <= 20:
-        return 'Very Low'
-    elif k <= 35:
-        return 'Low'
-    elif k <= 60:
-        return 'Medium'
-    elif k <= 100:
-        return 'High'
-    else:
-        return 'Very High'
-
-def categorize_temperature(temp):
-    if temp <= 18:
-        return 'Cool'
-    elif temp <= 25:
-        return 'Mild'
-    elif temp <= 32:
-        return 'Warm'
-    else:
-        return 'Hot'
+# Checksums, file locations and the artifact format are shared with the loader in the backend
+lookup_table_path = load_backend_module('lookup_table').lookup_table_path
+_model_artifact = load_backend_module('model_artifact')
+artifact_path = _model_artifact.artifact_path
+export_artifact = _model_artifact.export_artifact
+file_checksum = _model_artifact.file_checksum
 
-def categorize_humidity(humidity):
-    if humidity <= 40:
-        return 'Dry'
-    elif humidity <= 70:
-        return 'Moderate'
-    elif humidity <= 90:
-        return 'Humid'
-    else:
-        return 'Very Humid'
-
-def categorize_ph(ph):
-    if ph <= 6.0:
-        return 'Acidic'
-    elif ph <= 7.0:
-        return 'Neutral'
-    else:
-        return 'Alkaline'
-
-def categorize_rainfall(rainfall):
-    if rainfall <= 60:
-        return 'Low'
-    elif rainfall <= 120:
-        return 'Medium'
-    elif rainfall <= 200:
-        return 'High'
-    else:
-        return 'Very High'
+warnings.filterwarnings('ignore')
 
 def load_and_preprocess_data(file_path):
     print("Loading dataset...")
@@ -91,13 +39,7 @@ def load_and_preprocess_data(file_path):
     print(f"Unique crops: {df['label'].nunique()}")
     
     print("Converting numerical features to categorical ranges...")
-    df['N_cat'] = df['N'].apply(categorize_nitrogen)
-    df['P_cat'] = df['P'].apply(categorize_phosphorous)
-    df['K_cat'] = df['K'].apply(categorize_potassium)
-    df['temperature_cat'] = df['temperature'].apply(categorize_temperature)
-    df['humidity_cat'] = df['humidity'].apply(categorize_humidity)
-    df['ph_cat'] = df['ph'].apply(categorize_ph)
-    df['rainfall_cat'] = df['rainfall'].apply(categorize_rainfall)
+    bin_features(df)
     
     return df
 
@@ -193,17 +135,98 @@ def save_best_model(mlp, lr, best_model_name, encoders):
     print(f"\nSaving best model: {best_model_name}")
     
     best_model = mlp if best_model_name == 'Neural Network' else lr
+    save_model_package(best_model, best_model_name, encoders)
     
+    return best_model
+
+def save_model_package(model, model_type, encoders, model_path='crop_recommendation_model.pkl'):
     model_package = {
-        'model': best_model,
+        'model': model,
         'encoders': encoders,
-        'model_type': best_model_name
+        'model_type': model_type,
+        'model_version': datetime.now().strftime('%Y%m%d%H%M%S'),
+        'feature_bins': FEATURE_BINS
     }
     
-    joblib.dump(model_package, 'crop_recommendation_model.pkl')
-    print("Model saved as 'crop_recommendation_model.pkl'")
+    joblib.dump(model_package, model_path)
+    print(f"Model saved as '{model_path}'")
     
-    return best_model
+    # The lookup table is tied to the pickle it was built from
+    build_lookup_table(model, encoders, model_path)
+    export_model_artifact(model_path)
+    
+    return model_package
+
+def build_lookup_table(model, encoders, model_path='crop_recommendation_model.pkl', top_k=5):
+    print("\nBuilding recommendation lookup table...")
+    
+    categorical_columns = ['N_cat', 'P_cat', 'K_cat', 'temperature_cat', 
+                          'humidity_cat', 'ph_cat', 'rainfall_cat']
+    feature_columns = [col + '_encoded' for col in categorical_columns]
+    
+    # Every combination of encoded inputs, in row-major order so that the
+    # row of a sample is np.ravel_multi_index(codes, dims)
+    dims = np.array([len(encoders[col].classes_) for col in categorical_columns])
+    grid = np.indices(dims).reshape(len(dims), -1).T
+    X_grid = pd.DataFrame(grid, columns=feature_columns)
+    
+    classes = np.asarray(model.classes_)
+    probabilities = model.predict_proba(X_grid)
+    predicted = np.searchsorted(classes, model.predict(X_grid))
+    
+    top_k = min(top_k, len(classes))
+    top_classes = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+    top_probabilities = np.take_along_axis(probabilities, top_classes, axis=1)
+    
+    index_dtype = np.min_scalar_type(len(classes))
+    table_path = lookup_table_path(model_path)
+    
+    with open(table_path, 'wb') as f:
+        np.savez(
+            f,
+            model_checksum=np.array(file_checksum(model_path)),
+            feature_columns=np.array(categorical_columns),
+            dims=dims,
+            classes=classes.astype(str),
+            predicted=predicted.astype(index_dtype),
+            top_classes=top_classes.astype(index_dtype),
+            top_probabilities=top_probabilities
+        )
+    
+    print(f"Lookup table with {len(grid)} entries saved as '{table_path}'")
+    print(f"Lookup table checksum: {file_checksum(table_path)}")
+    
+    return table_path
+
+def build_lookup_table_from_file(model_path='crop_recommendation_model.pkl'):
+    model_package = joblib.load(model_path)
+    return build_lookup_table(model_package['model'], model_package['encoders'], model_path)
+
+def export_model_artifact(model_path='crop_recommendation_model.pkl'):
+    print("\nExporting memory-mapped model artifact...")
+    
+    model_package = joblib.load(model_path)
+    checksum = file_checksum(model_path)
+    
+    # Carry the lookup table over only if it was built from this pickle
+    lookup_arrays = None
+    table_path = lookup_table_path(model_path)
+    if os.path.exists(table_path):
+        with np.load(table_path, allow_pickle=False) as npz:
+            if str(npz['model_checksum']) == checksum:
+                lookup_arrays = {key: npz[key] for key in npz.files}
+    
+    directory = artifact_path(model_path)
+    try:
+        manifest = export_artifact(model_package, directory, checksum, lookup_arrays)
+    except ValueError as e:
+        print(f"Model artifact not exported: {e}")
+        return None
+    
+    print(f"Model artifact saved in '{directory}'")
+    print(f"Model artifact checksum: {manifest['sha256']}")
+    
+    return directory
 
 def generate_detailed_report(y_test, models_results):
     print("\nGenerating detailed performance report...")
@@ -321,6 +344,8 @@ def main():
     print("="*50)
     print("Files created:")
     print("- crop_recommendation_model.pkl (best model)")
+    print("- crop_recommendation_model_lookup.npz (precomputed recommendations)")
+    print("- crop_recommendation_model_artifact/ (memory-mapped model for the API)")
     print("- model_performance_report.txt (detailed metrics)")
     
     print("\nTo make predictions, use the following categorical inputs:")
@@ -333,4 +358,9 @@ def main():
     print("Rainfall: Low, Medium, High, Very High")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == '--build-lookup':
+        build_lookup_table_from_file(sys.argv[2] if len(sys.argv) > 2 else 'crop_recommendation_model.pkl')
+    elif len(sys.argv) > 1 and sys.argv[1] == '--export-artifact':
+        export_model_artifact(sys.argv[2] if len(sys.argv) > 2 else 'crop_recommendation_model.pkl')
+    else:
+        main()
\ No newline at end of file
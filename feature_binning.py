@@ -0,0 +1,63 @@
+"""
+Threshold tables that turn raw soil and weather readings into the
+categorical levels the crop recommendation model is trained on
+"""
+import numpy as np
+import pandas as pd
+
+# For each raw feature: the categorical column it feeds, the inclusive upper
+# bound of every level except the last, and the level names in order
+FEATURE_BINS = {
+    'N': {
+        'column': 'N_cat',
+        'thresholds': [20, 40, 80, 120],
+        'labels': ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+    },
+    'P': {
+        'column': 'P_cat',
+        'thresholds': [25, 50, 75, 100],
+        'labels': ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+    },
+    'K': {
+        'column': 'K_cat',
+        'thresholds': [20, 35, 60, 100],
+        'labels': ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+    },
+    'temperature': {
+        'column': 'temperature_cat',
+        'thresholds': [18, 25, 32],
+        'labels': ['Cool', 'Mild', 'Warm', 'Hot']
+    },
+    'humidity': {
+        'column': 'humidity_cat',
+        'thresholds': [40, 70, 90],
+        'labels': ['Dry', 'Moderate', 'Humid', 'Very Humid']
+    },
+    'ph': {
+        'column': 'ph_cat',
+        'thresholds': [6.0, 7.0],
+        'labels': ['Acidic', 'Neutral', 'Alkaline']
+    },
+    'rainfall': {
+        'column': 'rainfall_cat',
+        'thresholds': [60, 120, 200],
+        'labels': ['Low', 'Medium', 'High', 'Very High']
+    }
+}
+
+def bin_values(feature, values):
+    """Convert an array of raw readings for one feature to level names"""
+    spec = FEATURE_BINS[feature]
+    # right=True puts a value equal to a threshold in the lower level (<=)
+    indices = np.digitize(np.asarray(values, dtype=float), spec['thresholds'], right=True)
+    return np.asarray(spec['labels'], dtype=object)[indices]
+
+def bin_value(feature, value):
+    """Convert a single raw reading to its level name"""
+    return bin_values(feature, [value])[0]
+
+def bin_features(df):
+    """Add the categorical *_cat columns for every raw feature in a DataFrame"""
+    for feature, spec in FEATURE_BINS.items():
+        df[spec['column']] = pd.Series(bin_values(feature, df[feature].to_numpy()), index=df.index)
+    return df
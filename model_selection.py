@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.neural_network import MLPClassifier
+
+from crop_recommendation_model import encode_categorical_features, load_and_preprocess_data, save_model_package
+
+warnings.filterwarnings('ignore')
+
+DEFAULT_DATA_PATH = os.path.join('dataset', 'Merged_Crop_Recommendation.csv')
+
+MODEL_FAMILIES = {
+    'Neural Network': MLPClassifier,
+    'Logistic Regression': LogisticRegression,
+    'Random Forest': RandomForestClassifier
+}
+
+# Hyperparameters tried for each model family, expanded with ParameterGrid
+DEFAULT_GRID = {
+    'Neural Network': {
+        'hidden_layer_sizes': [(100, 50), (64,)],
+        'learning_rate_init': [0.001],
+        'max_iter': [1000],
+        'random_state': [42]
+    },
+    'Logistic Regression': {
+        'C': [0.1, 1.0, 10.0],
+        'max_iter': [1000],
+        'multi_class': ['ovr'],
+        'random_state': [42]
+    },
+    'Random Forest': {
+        'n_estimators': [50, 200],
+        'max_depth': [None, 12],
+        'random_state': [42]
+    }
+}
+
+def build_candidates(grid, families=None):
+    candidates = []
+    for family, param_grid in grid.items():
+        if families and family not in families:
+            continue
+        for params in ParameterGrid(param_grid):
+            candidates.append((family, params))
+    return candidates
+
+def measure_latency(model, X, repeats=200):
+    # Single-row predict_proba calls, the way the API scores one request
+    rows = X[np.arange(repeats) % len(X)]
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row[np.newaxis, :])
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch_time = time.perf_counter() - start
+
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'batch_rows_per_sec': float(len(X) / batch_time) if batch_time > 0 else None
+    }
+
+def evaluate_candidate(candidate, X, y, folds, seed=42):
+    family, params = candidate
+    estimator = MODEL_FAMILIES[family](**params)
+
+    fit_times = []
+    f1_scores = []
+    accuracies = []
+    first_fold = None
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for train_index, test_index in splitter.split(X, y):
+        model = clone(estimator)
+
+        start = time.perf_counter()
+        model.fit(X[train_index], y[train_index])
+        fit_times.append(time.perf_counter() - start)
+
+        predictions = model.predict(X[test_index])
+        f1_scores.append(f1_score(y[test_index], predictions, average='macro'))
+        accuracies.append(accuracy_score(y[test_index], predictions))
+
+        if first_fold is None:
+            first_fold = (model, test_index)
+
+    # The first fold's model goes back to the parent for latency measurement
+    return {
+        'model_type': family,
+        'params': {key: list(value) if isinstance(value, tuple) else value for key, value in params.items()},
+        'f1_macro': float(np.mean(f1_scores)),
+        'f1_macro_std': float(np.std(f1_scores)),
+        'accuracy': float(np.mean(accuracies)),
+        'fit_time_sec': float(np.mean(fit_times))
+    }, first_fold
+
+def run_model_selection(X, y, candidates, folds=5, n_jobs=None):
+    print(f"Evaluating {len(candidates)} candidates with {folds}-fold cross-validation...")
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(evaluate_candidate, candidate, X, y, folds) for candidate in candidates]
+        evaluated = [future.result() for future in futures]
+
+    # Latency is timed one model at a time once the pool has exited, so
+    # the timings are not slowed by other candidates fitting on every core
+    results = []
+    for result, (model, test_index) in evaluated:
+        result['latency'] = measure_latency(model, X[test_index])
+        print(f"  {result['model_type']} {result['params']}: "
+              f"F1={result['f1_macro']:.4f} fit={result['fit_time_sec']:.2f}s "
+              f"p99={result['latency']['p99_ms']:.3f}ms")
+        results.append(result)
+
+    return results
+
+def select_model(results, latency_budget_ms):
+    # Best F1 among candidates whose p99 single-request latency fits the budget
+    within_budget = [result for result in results if result['latency']['p99_ms'] <= latency_budget_ms]
+    if within_budget:
+        return max(within_budget, key=lambda result: (result['f1_macro'], -result['latency']['p99_ms']))
+
+    print(f"WARNING: No candidate meets the {latency_budget_ms}ms latency budget, choosing the fastest")
+    return min(results, key=lambda result: result['latency']['p99_ms'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Select and train the crop recommendation model')
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='training dataset CSV')
+    parser.add_argument('--folds', type=int, default=5, help='number of cross-validation folds')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--latency-budget-ms', type=float, default=10.0, help='p99 single-request latency budget')
+    parser.add_argument('--families', nargs='+', choices=list(MODEL_FAMILIES), help='model families to try')
+    parser.add_argument('--results', default='model_selection_results.json', help='where to write candidate results')
+    parser.add_argument('--model-path', default='crop_recommendation_model.pkl', help='where to save the selected model')
+    args = parser.parse_args()
+
+    print("CROP RECOMMENDATION MODEL SELECTION")
+    print("="*50)
+
+    df = load_and_preprocess_data(args.data)
+    X, y, encoders = encode_categorical_features(df)
+    X = X.to_numpy()
+    y = y.to_numpy()
+
+    candidates = build_candidates(DEFAULT_GRID, args.families)
+    results = run_model_selection(X, y, candidates, args.folds, args.jobs)
+
+    selected = select_model(results, args.latency_budget_ms)
+    print(f"\nSelected model: {selected['model_type']} {selected['params']} "
+          f"(F1-Score: {selected['f1_macro']:.4f}, p99: {selected['latency']['p99_ms']:.3f}ms)")
+
+    with open(args.results, 'w') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'data': args.data,
+            'folds': args.folds,
+            'latency_budget_ms': args.latency_budget_ms,
+            'selected': selected,
+            'candidates': results
+        }, f, indent=2)
+    print(f"Candidate results saved as '{args.results}'")
+
+    print("Refitting selected model on the full dataset...")
+    params = {key: tuple(value) if isinstance(value, list) else value for key, value in selected['params'].items()}
+    model = MODEL_FAMILIES[selected['model_type']](**params)
+    model.fit(X, y)
+    save_model_package(model, selected['model_type'], encoders, args.model_path)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import joblib
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from feature_binning import bin_value
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -24,82 +25,15 @@ def load_model():
 
 def categorize_features(n, p, k, temp, humidity, ph, rainfall):
     """Convert numerical values to categorical features"""
-    
-    # Nitrogen categorization
-    if n <= 20:
-        n_cat = 'Very Low'
-    elif n <= 40:
-        n_cat = 'Low'
-    elif n <= 80:
-        n_cat = 'Medium'
-    elif n <= 120:
-        n_cat = 'High'
-    else:
-        n_cat = 'Very High'
-    
-    # Phosphorous categorization
-    if p <= 25:
-        p_cat = 'Very Low'
-    elif p <= 50:
-        p_cat = 'Low'
-    elif p <= 75:
-        p_cat = 'Medium'
-    elif p <= 100:
-        p_cat = 'High'
-    else:
-        p_cat = 'Very High'
-    
-    # Potassium categorization
-    if k <= 20:
-        k_cat = 'Very Low'
-    elif k <= 35:
-        k_cat = 'Low'
-    elif k <= 60:
-        k_cat = 'Medium'
-    elif k <= 100:
-        k_cat = 'High'
-    else:
-        k_cat = 'Very High'
-    
-    # Temperature categorization
-    if temp <= 18:
-        temp_cat = 'Cool'
-    elif temp <= 25:
-        temp_cat = 'Mild'
-    elif temp <= 32:
-        temp_cat = 'Warm'
-    else:
-        temp_cat = 'Hot'
-    
-    # Humidity categorization
-    if humidity <= 40:
-        humidity_cat = 'Dry'
-    elif humidity <= 70:
-        humidity_cat = 'Moderate'
-    elif humidity <= 90:
-        humidity_cat = 'Humid'
-    else:
-        humidity_cat = 'Very Humid'
-    
-    # pH categorization
-    if ph <= 6.0:
-        ph_cat = 'Acidic'
-    elif ph <= 7.0:
-        ph_cat = 'Neutral'
-    else:
-        ph_cat = 'Alkaline'
-    
-    # Rainfall categorization
-    if rainfall <= 60:
-        rainfall_cat = 'Low'
-    elif rainfall <= 120:
-        rainfall_cat = 'Medium'
-    elif rainfall <= 200:
-        rainfall_cat = 'High'
-    else:
-        rainfall_cat = 'Very High'
-    
-    return n_cat, p_cat, k_cat, temp_cat, humidity_cat, ph_cat, rainfall_cat
+    return (
+        bin_value('N', n),
+        bin_value('P', p),
+        bin_value('K', k),
+        bin_value('temperature', temp),
+        bin_value('humidity', humidity),
+        bin_value('ph', ph),
+        bin_value('rainfall', rainfall)
+    )
 
 def predict_crop_from_categorical(model, encoders, n_cat, p_cat, k_cat, temp_cat, humidity_cat, ph_cat, rainfall_cat):
     """Make prediction using categorical inputs"""
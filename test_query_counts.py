@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Check that seller search endpoints run a fixed number of SQL queries
+
+Seeds an in-memory SQLite database with sellers spread over every city and
+fails if a search issues more queries as the number of results grows.
+"""
+
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, backend_path)
+
+from app import create_app, db
+from app.models import City, District, User, Seller, SellerCrop
+from app.utils.query_counter import QueryCounter
+
+# Endpoints and the most queries each may issue, however many rows match
+ENDPOINT_QUERY_LIMITS = [
+    ('/api/find-sellers/rice?verified_only=false', 1),
+    ('/api/find-sellers/rice?verified_only=false&fields=full', 1),
+    ('/api/crops/search?q=rice&per_page=100', 2),
+    ('/api/buyer-full/search-crops?crop_name=rice', 1)
+]
+
+def seed_sellers(total):
+    """Add sellers with one rice listing each until there are total, cycling through all cities"""
+    cities = City.query.all()
+    for i in range(Seller.query.count(), total):
+        city = cities[i % len(cities)]
+        district = db.session.get(District, city.district_id)
+
+        user = User(email=f'query-count-{i}@example.com', user_type='seller')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.flush()
+
+        seller = Seller(
+            user_id=user.id,
+            business_name=f'Query Count Seller {i}',
+            contact_number='0771234567',
+            address_line_1=f'{i} Main Street',
+            province_id=district.province_id,
+            district_id=district.id,
+            city_id=city.id,
+            is_verified=True
+        )
+        db.session.add(seller)
+        db.session.flush()
+
+        db.session.add(SellerCrop(seller_id=seller.id, crop_name='rice', price_per_kg=100 + i, quantity_available=50))
+    db.session.commit()
+
+def count_queries(app, client, url):
+    # Drop loaded objects so relationships are not served from the identity map
+    with app.app_context():
+        db.session.remove()
+    with app.app_context():
+        with QueryCounter(db.engine) as counter:
+            response = client.get(url)
+    return response, counter.count
+
+def test_query_counts():
+    """Search endpoints must not issue one query per result"""
+    app = create_app('testing')
+    client = app.test_client()
+    failures = []
+
+    for total_sellers in (5, 100):
+        with app.app_context():
+            seed_sellers(total_sellers)
+
+        for url, limit in ENDPOINT_QUERY_LIMITS:
+            # Warm up per-process caches such as the crop name index
+            client.get(url)
+            response, queries = count_queries(app, client, url)
+            status = 'OK' if response.status_code == 200 and queries <= limit else 'FAIL'
+            print(f"{status}: {url} with {total_sellers} sellers -> {queries} queries (limit {limit})")
+            if status == 'FAIL':
+                failures.append(url)
+
+    return not failures
+
+if __name__ == "__main__":
+    success = test_query_counts()
+    print("\nAll query counts within limits" if success else "\nQuery count check FAILED")
+    sys.exit(0 if success else 1)
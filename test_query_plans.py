@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Check that marketplace search queries are served by indexes
+
+Runs each hot endpoint against an in-memory SQLite database, captures the SQL
+it emits and fails if EXPLAIN QUERY PLAN shows a full scan of a large table.
+"""
+
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, backend_path)
+
+from app import create_app, db
+from app.models import Seller
+from app.utils.query_counter import QueryCounter
+from app.utils.seller_dashboard import invalidate_seller_dashboards
+from test_query_counts import seed_sellers
+
+# Tables that grow with the marketplace; a full scan of any of them fails the check
+LARGE_TABLES = ('sellers', 'seller_crops', 'crop_cultivations', 'seller_crop_deletions')
+
+# Endpoints whose every statement must be served by an index
+HOT_ENDPOINTS = [
+    '/api/find-sellers/rice?verified_only=false',
+    '/api/find-sellers/rice?verified_only=false&fields=full',
+    '/api/find-sellers/rice?province_id=1&district_id=1&organic_only=true',
+    '/api/find-sellers/rice?city_id=1',
+    '/api/crops/search?q=rice&per_page=100',
+    '/api/crops/search?q=rice&province_id=1&organic_only=true&available_only=false',
+    '/api/buyer-full/search-crops?crop_name=rice',
+    '/api/buyer-full/search-crops?crop_name=rice&district_id=1&max_price=150',
+    '/api/buyer-full/search-crops?province_id=1',
+    '/api/buyer-full/search-crops?district_id=1&organic_only=true',
+    '/api/seller/crops/{seller_id}?fields=full',
+    '/api/seller/dashboard/{seller_id}',
+    '/api/seller/crops/{seller_id}/changes'
+]
+
+def full_scans(connection, statement, parameters):
+    """Get the plan lines of a statement that scan a large table from end to end"""
+    plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    details = [row[-1] for row in plan]
+    return [
+        detail for detail in details
+        if any(detail == f'SCAN {table}' or detail.startswith(f'SCAN {table} ') for table in LARGE_TABLES)
+        and 'USING INDEX' not in detail and 'USING COVERING INDEX' not in detail
+    ], details
+
+def test_query_plans(verbose=False):
+    """Hot search and seller queries must not fall back to a full table scan"""
+    app = create_app('testing')
+    client = app.test_client()
+    failures = []
+
+    with app.app_context():
+        seed_sellers(200)
+        seller_id = Seller.query.first().id
+
+    for template in HOT_ENDPOINTS:
+        url = template.format(seller_id=seller_id)
+        # Warm up per-process caches so only the endpoint's own queries are captured
+        client.get(url)
+        invalidate_seller_dashboards()
+        with app.app_context():
+            db.session.remove()
+            with QueryCounter(db.engine) as counter:
+                response = client.get(url)
+
+            problems = []
+            with db.engine.connect() as connection:
+                for statement, parameters in zip(counter.statements, counter.parameters):
+                    scans, details = full_scans(connection, statement, parameters)
+                    problems.extend(scans)
+                    if verbose:
+                        print(f"    {' '.join(statement.split())[:160]}")
+                        for detail in details:
+                            print(f"      {detail}")
+
+        status = 'OK' if response.status_code == 200 and counter.count and not problems else 'FAIL'
+        print(f"{status}: {url} -> {counter.count} queries" + (f" ({'; '.join(problems)})" if problems else ''))
+        if status == 'FAIL':
+            failures.append(url)
+
+    return not failures
+
+if __name__ == "__main__":
+    success = test_query_plans(verbose='--verbose' in sys.argv)
+    print("\nAll hot queries use indexes" if success else "\nQuery plan check FAILED")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Check that the simple_api seller lookup runs one query however many sellers match
+
+Builds the schema in an in-memory SQLite database and counts the statements
+the lookup sends to it.
+"""
+
+import sys
+import os
+import sqlite3
+
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, backend_path)
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app import db
+import app.models  # noqa: F401 - registers the tables on db.metadata
+from app.utils.seller_lookup import fetch_sellers_for_crop
+
+def create_database():
+    """Create every table in an in-memory SQLite database"""
+    connection = sqlite3.connect(':memory:')
+    engine = create_engine('sqlite://', creator=lambda: connection, poolclass=StaticPool)
+    db.metadata.create_all(engine)
+    return connection
+
+def seed(connection, total):
+    """Add total sellers with one rice listing each, every other listing with cultivation info"""
+    connection.execute("INSERT INTO provinces (id, name) VALUES (1, 'Western')")
+    connection.execute("INSERT INTO districts (id, name, province_id) VALUES (1, 'Colombo', 1)")
+    connection.execute("INSERT INTO cities (id, name, district_id) VALUES (1, 'Colombo', 1)")
+    for i in range(total):
+        connection.execute(
+            "INSERT INTO users (id, email, password_hash, user_type, is_active) VALUES (?, ?, 'x', 'seller', 1)",
+            (f'user-{i}', f'lookup-{i}@example.com'))
+        connection.execute(
+            "INSERT INTO sellers (id, user_id, business_name, contact_number, address_line_1, province_id, district_id, city_id, is_verified, is_active) "
+            "VALUES (?, ?, ?, '0771234567', 'Main Street', 1, 1, 1, ?, 1)",
+            (f'seller-{i}', f'user-{i}', f'Seller {i}', i % 2))
+        connection.execute(
+            "INSERT INTO seller_crops (id, seller_id, crop_name, price_per_kg, is_available) VALUES (?, ?, 'Rice', ?, 1)",
+            (f'crop-{i}', f'seller-{i}', 100 + i))
+        if i % 2 == 0:
+            connection.execute(
+                "INSERT INTO crop_cultivations (id, seller_crop_id, soil_type) VALUES (?, ?, 'Clay')",
+                (f'cultivation-{i}', f'crop-{i}'))
+    connection.commit()
+
+def test_seller_lookup():
+    """The lookup must return every listing with its cultivation info from one statement"""
+    connection = create_database()
+    seed(connection, 20)
+
+    statements = []
+    connection.set_trace_callback(statements.append)
+    sellers = fetch_sellers_for_crop(connection, 'rice', placeholder='?')
+    connection.set_trace_callback(None)
+
+    checks = [
+        ('one statement', len(statements) == 1),
+        ('all sellers returned', len(sellers) == 20),
+        ('verified sellers first', [s['is_verified'] for s in sellers] == sorted([s['is_verified'] for s in sellers], reverse=True)),
+        ('cultivation info attached', all(
+            (s['cultivation_info'] or {}).get('soil_type') == 'Clay' if int(s['seller_crop_id'].split('-')[1]) % 2 == 0
+            else s['cultivation_info'] is None
+            for s in sellers
+        ))
+    ]
+
+    for name, passed in checks:
+        print(f"{'OK' if passed else 'FAIL'}: {name}")
+    print(f"Statements executed: {len(statements)}")
+    return all(passed for _, passed in checks)
+
+if __name__ == "__main__":
+    success = test_seller_lookup()
+    print("\nSeller lookup check passed" if success else "\nSeller lookup check FAILED")
+    sys.exit(0 if success else 1)
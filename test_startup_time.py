@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Check that production app startup stays fast
+
+Creates the production app in fresh interpreters against a throwaway SQLite
+database and fails if startup imports the ML stack, registers debug
+blueprints, runs SQL or takes longer than the budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+# Modules that must stay unloaded until the first recommendation
+HEAVY_MODULES = ['numpy', 'joblib', 'sklearn', 'pandas']
+DEBUG_BLUEPRINTS = ['buyer_test', 'main_test']
+
+# Runs in a fresh interpreter so every import is measured cold
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+statements = []
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+from app import create_app
+app = create_app(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'startup_ms': elapsed * 1000,
+    'modules': sorted(sys.modules),
+    'blueprints': sorted(app.blueprints),
+    'statements': len(statements)
+}))
+"""
+
+def measure_startup(config_name, database_url):
+    """Create the app in a new interpreter and get its startup measurements"""
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV=config_name)
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT, config_name],
+        cwd=backend_path, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # create_app prints progress messages before the JSON line
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_startup_time(runs=5, budget_ms=1500):
+    """Production startup must skip the ML stack, debug blueprints and schema work"""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        results = [measure_startup('production', database_url) for _ in range(runs)]
+        development = measure_startup('development', database_url)
+
+    median_ms = statistics.median(result['startup_ms'] for result in results)
+    last = results[-1]
+    loaded_heavy = [name for name in HEAVY_MODULES if name in last['modules']]
+    loaded_debug = [name for name in DEBUG_BLUEPRINTS if name in last['blueprints']]
+
+    checks = [
+        (f"startup median {median_ms:.0f} ms (budget {budget_ms} ms)", median_ms <= budget_ms),
+        (f"ML modules imported: {', '.join(loaded_heavy) or 'none'}", not loaded_heavy),
+        (f"debug blueprints registered: {', '.join(loaded_debug) or 'none'}", not loaded_debug),
+        (f"no SQL at startup ({last['statements']} statements)", last['statements'] == 0)
+    ]
+
+    for name, passed in checks:
+        print(f"{'OK' if passed else 'FAIL'}: {name}")
+    print(f"Development startup for reference: {development['startup_ms']:.0f} ms, {development['statements']} statements")
+    return all(passed for _, passed in checks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Guard production startup time')
+    parser.add_argument('--runs', type=int, default=5, help='cold starts to take the median of')
+    parser.add_argument('--budget-ms', type=float, default=1500, help='maximum median startup time')
+    args = parser.parse_args()
+
+    success = test_startup_time(args.runs, args.budget_ms)
+    print("\nStartup check passed" if success else "\nStartup check FAILED")
+    sys.exit(0 if success else 1)